@@ -1,7 +1,174 @@
-# import os
-# import uvicorn
+import gc
+import os
+import signal
+import socket
+import sys
+import time
 
-from project import app
+from project import create_app
 
-# if __name__ == "__main__":
-#     uvicorn.run(app, host="0.0.0.0", port=int(os.getenv("API_PORT", 8000)))
+app = create_app()
+
+
+class ServerConfig:
+    HOST = os.getenv("API_HOST") or "0.0.0.0"
+    PORT = int(os.getenv("API_PORT") or 8000)
+    WORKERS = int(os.getenv("API_WORKERS") or 1)
+    BACKLOG = int(os.getenv("API_BACKLOG", 2048))
+    MEMORY_REPORT_INTERVAL = float(os.getenv("API_MEMORY_REPORT_INTERVAL", 60))
+    # A worker that exits within MIN_UPTIME of being forked counts as a failed start: replacements back off
+    # exponentially, and after MAX_FAILED_STARTS in a row the server gives up instead of re-forking forever
+    MIN_UPTIME = float(os.getenv("API_WORKER_MIN_UPTIME", 10))
+    MAX_FAILED_STARTS = int(os.getenv("API_WORKER_MAX_FAILED_STARTS", 5))
+    MAX_RESTART_DELAY = float(os.getenv("API_WORKER_MAX_RESTART_DELAY", 30))
+
+
+STOP_SIGNALS = {signal.SIGINT, signal.SIGTERM}
+
+
+def preload():
+    # Loaded once in the server process so every worker maps the same pages copy-on-write: the lookup tables are
+    # already built by create_app, this pulls in the modules the app itself only imports on first use
+    import numpy  # noqa: F401
+    import psutil  # noqa: F401
+    import jwt  # noqa: F401
+    from project.utils import BatchService  # noqa: F401
+
+    if os.getenv("MARIADB_URL"):
+        from database.crud import admins, articles, forms  # noqa: F401
+        from database.mariadb import models  # noqa: F401
+
+    # Objects that survive to this point are never collected, so the collector never writes to their pages
+    gc.collect()
+    gc.freeze()
+
+
+def bind_socket() -> socket.socket:
+    sock = socket.socket(socket.AF_INET6 if ":" in ServerConfig.HOST else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((ServerConfig.HOST, ServerConfig.PORT))
+    sock.listen(ServerConfig.BACKLOG)
+    sock.set_inheritable(True)
+    return sock
+
+
+def run_worker(sock: socket.socket):
+    import uvicorn
+
+    for signum in STOP_SIGNALS:
+        signal.signal(signum, signal.SIG_DFL)
+    signal.pthread_sigmask(signal.SIG_UNBLOCK, STOP_SIGNALS)
+
+    config = uvicorn.Config(app, host=ServerConfig.HOST, port=ServerConfig.PORT, proxy_headers=True)
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def spawn_worker(sock: socket.socket, workers: dict[int, float]):
+    # Stop signals are held across fork: the child must not run the server's handler before resetting it, and the
+    # server must not miss a worker it has not recorded yet
+    signal.pthread_sigmask(signal.SIG_BLOCK, STOP_SIGNALS)
+    pid = os.fork()
+    if pid == 0:
+        status = 0
+        try:
+            run_worker(sock)
+        except BaseException as error:
+            print(f"Worker {os.getpid()} crashed: {error!r}", file=sys.stderr)
+            status = 1
+        finally:
+            os._exit(status)
+
+    workers[pid] = time.monotonic()
+    signal.pthread_sigmask(signal.SIG_UNBLOCK, STOP_SIGNALS)
+
+
+def report_memory(workers: dict[int, float]):
+    from project.utils.HealthService import get_memory_usage
+
+    rows = [("server", os.getpid())] + [("worker", pid) for pid in sorted(workers)]
+    for role, pid in rows:
+        try:
+            memory = get_memory_usage(pid)
+        except Exception as error:
+            print(f"Memory report for {pid} failed: {error}")
+            continue
+        print(f"{role} {pid}: rss {memory['rss'] / 1048576:.1f} MB, uss {memory['uss'] / 1048576:.1f} MB, "
+              f"pss {memory['pss'] / 1048576:.1f} MB, shared {memory['shared'] / 1048576:.1f} MB", flush=True)
+
+
+def serve() -> int:
+    workers = {}
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    # Installed before any worker exists, so a signal during startup is never left to the default handler, which
+    # would kill the server and orphan the workers already forked
+    for signum in STOP_SIGNALS:
+        signal.signal(signum, stop)
+
+    preload()
+    sock = bind_socket()
+    for _ in range(ServerConfig.WORKERS):
+        if stopping:
+            break
+        spawn_worker(sock, workers)
+    print(f"Serving on {ServerConfig.HOST}:{ServerConfig.PORT} with {len(workers)} workers", flush=True)
+
+    # First report shortly after the workers have started, then every MEMORY_REPORT_INTERVAL seconds
+    next_report = None
+    if ServerConfig.MEMORY_REPORT_INTERVAL:
+        next_report = time.monotonic() + min(ServerConfig.MEMORY_REPORT_INTERVAL, 10)
+
+    exit_status = 0
+    failed_starts = 0
+    restarts = []
+    while workers or (restarts and not stopping):
+        pid = 0
+        if workers:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+
+        if pid:
+            started_at = workers.pop(pid, time.monotonic())
+            if stopping:
+                continue
+
+            failed_starts = failed_starts + 1 if time.monotonic() - started_at < ServerConfig.MIN_UPTIME else 0
+            if failed_starts >= ServerConfig.MAX_FAILED_STARTS:
+                print(f"Worker {pid} exited with status {status}, {failed_starts} workers in a row failed to start, "
+                      f"shutting down", file=sys.stderr, flush=True)
+                exit_status = 1
+                stop(None, None)
+                continue
+
+            delay = min(0.5 * 2 ** failed_starts, ServerConfig.MAX_RESTART_DELAY) if failed_starts else 0.0
+            print(f"Worker {pid} exited with status {status}, restarting in {delay:.1f}s", flush=True)
+            restarts.append(time.monotonic() + delay)
+            restarts.sort()
+            continue
+
+        while restarts and restarts[0] <= time.monotonic() and not stopping:
+            restarts.pop(0)
+            spawn_worker(sock, workers)
+
+        if next_report is not None and time.monotonic() >= next_report and not stopping:
+            report_memory(workers)
+            next_report = time.monotonic() + ServerConfig.MEMORY_REPORT_INTERVAL
+        time.sleep(0.5)
+
+    sock.close()
+    return exit_status
+
+
+if __name__ == "__main__":
+    sys.exit(serve())
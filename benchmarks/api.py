@@ -0,0 +1,298 @@
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import sys
+import tempfile
+import time
+from typing import Awaitable, Callable, NamedTuple, Optional
+
+import httpx
+import psutil
+
+DATABASE_PATH = os.path.join(tempfile.gettempdir(), "netify_benchmark.sqlite3")
+os.environ.setdefault("MARIADB_URL", f"sqlite+aiosqlite:///{DATABASE_PATH}")
+# Every scenario comes from one client, so the per-client limits would measure rejections instead of the handlers
+os.environ.setdefault("ADMISSION_CONTROL", "0")
+# The forms export is only mounted behind the API key check
+os.environ.setdefault("API_KEYS", "benchmark")
+API_KEY = os.environ["API_KEYS"].split(",")[0]
+os.environ.setdefault("JWT_SECRET_KEY", "benchmark-secret-key-not-for-production")
+
+from app import app  # noqa: E402
+
+
+class Scenario(NamedTuple):
+    name: str
+    call: Callable[[httpx.AsyncClient], Awaitable]
+    iterations: Optional[int] = None
+    skip: Optional[str] = None
+
+
+def http(method: str, url: str, json_body=None, expected_status: int = 200):
+    async def call(client: httpx.AsyncClient):
+        response = await client.request(method, url, json=json_body)
+        if response.status_code != expected_status:
+            raise RuntimeError(f"{method} {url} returned {response.status_code}: {response.text[:200]}")
+        return response
+
+    return call
+
+
+def crud(function, *args, **kwargs):
+    async def call(client: httpx.AsyncClient):
+        return await function(*args, **kwargs)
+
+    return call
+
+
+def article_payload(url: str, article_id: int) -> dict:
+    languages = ("en", "ru", "uk")
+    return {
+        "title": {lang: f"Article {article_id} ({lang})" for lang in languages},
+        "content": {lang: f"Article {article_id} content " * 100 for lang in languages},
+        "page": {
+            "url": url,
+            "title": {lang: f"Page {article_id} ({lang})" for lang in languages},
+            "description": {lang: f"Description {article_id}" for lang in languages},
+        },
+    }
+
+
+def create_article_scenario(delete: bool = False):
+    from database.crud.articles import create_article, delete_article, load_article
+
+    # Every call writes a fresh url, so repeated iterations never hit the url conflict check
+    counter = itertools.count()
+
+    async def call(client: httpx.AsyncClient):
+        url = f"benchmark-{'delete' if delete else 'create'}-{next(counter)}"
+        await create_article(article_payload(url, 0))
+        if delete:
+            article = await load_article(url)
+            await delete_article(article["article_id"])
+
+    return call
+
+
+def create_admin_scenario():
+    from database.crud.admins import create_admin
+
+    counter = itertools.count()
+
+    async def call(client: httpx.AsyncClient):
+        admin_id = next(counter)
+        await create_admin({"username": f"benchmark-{admin_id}", "email": f"benchmark{admin_id}@example.com",
+                            "password": "benchmark", "permissions": ["articles"]})
+
+    return call
+
+
+def get_scenarios() -> list[Scenario]:
+    from sqlalchemy import make_url
+
+    from database.crud.admins import get_admin, load_admin, login
+    from database.crud.articles import get_article, get_articles, load_article, load_articles, update_article
+    from database.crud.forms import create_form, get_form, get_forms
+
+    vlsm_subnets = [{"name": f"segment-{i}", "hosts": (i * 37) % 500 + 2} for i in range(1000)]
+    batch_ips = [f"10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256}" for i in range(10000)]
+    batch_binaries = [f"{i:032b}" for i in range(10000)]
+    batch_prefixes = [i % 32 + 1 for i in range(10000)]
+    batch_masks = [f"255.255.{(0xFF00 >> (i % 9)) & 0xFF}.0" for i in range(10000)]
+    # MATCH ... AGAINST needs the MariaDB FULLTEXT index; other backends have no equivalent
+    search_skip = None
+    if make_url(os.environ["MARIADB_URL"]).get_backend_name() not in ("mysql", "mariadb"):
+        search_skip = "needs MariaDB FULLTEXT"
+
+    return [
+        Scenario("GET /v1/health/", http("GET", "/v1/health/")),
+        Scenario("GET /metrics", http("GET", "/metrics")),
+        Scenario("GET /v1/ip/bin/", http("GET", "/v1/ip/bin/192.168.1.1/")),
+        Scenario("GET /v1/ip/dec/", http("GET", "/v1/ip/dec/11000000101010000000000100000001/")),
+        Scenario("GET /v1/mask/prefix/", http("GET", "/v1/mask/prefix/24/")),
+        Scenario("GET /v1/mask/ip/", http("GET", "/v1/mask/ip/255.255.255.0/")),
+        Scenario("POST /v1/network/details/", http("POST", "/v1/network/details/",
+                                                   {"ip_address": "192.168.1.1", "mask_prefix": 24})),
+        Scenario("POST /v1/network/subnets/ /24 -> /27", http("POST", "/v1/network/subnets/", {
+            "network_ip_address": "192.168.1.0", "mask_prefix": 24, "hosts_per_subnet": 30})),
+        Scenario("POST /v1/network/subnets/ /8 -> /30 page 1000", http("POST", "/v1/network/subnets/", {
+            "network_ip_address": "10.0.0.0", "mask_prefix": 8, "hosts_per_subnet": 2, "limit": 1000})),
+        Scenario("POST /v1/network/subnets/ /8 -> /30 deep page", http("POST", "/v1/network/subnets/", {
+            "network_ip_address": "10.0.0.0", "mask_prefix": 8, "hosts_per_subnet": 2,
+            "offset": 4193304, "limit": 1000})),
+        Scenario("POST /v1/network/subnets/ /16 -> /30 unpaged", http("POST", "/v1/network/subnets/", {
+            "network_ip_address": "10.0.0.0", "mask_prefix": 16, "hosts_per_subnet": 2}), 20),
+        Scenario("POST /v1/network/subnets/stream/ /12 -> /30", http("POST", "/v1/network/subnets/stream/", {
+            "network_ip_address": "10.0.0.0", "mask_prefix": 12, "hosts_per_subnet": 2}), 5),
+        Scenario("POST /v1/network/vlsm/ 1000 segments", http("POST", "/v1/network/vlsm/", {
+            "network_ip_address": "10.0.0.0", "mask_prefix": 8, "subnets": vlsm_subnets}), 50),
+        Scenario("POST /v1/batch/ip/bin/ 10k", http("POST", "/v1/batch/ip/bin/", {"ip_addresses": batch_ips}), 20),
+        Scenario("POST /v1/batch/ip/dec/ 10k", http("POST", "/v1/batch/ip/dec/",
+                                                    {"ip_addresses_bin": batch_binaries}), 20),
+        Scenario("POST /v1/batch/mask/prefix/ 10k", http("POST", "/v1/batch/mask/prefix/",
+                                                         {"prefixes": batch_prefixes}), 20),
+        Scenario("POST /v1/batch/mask/ip/ 10k", http("POST", "/v1/batch/mask/ip/", {"masks_ip": batch_masks}), 20),
+        Scenario("POST /v1/batch/network/details/ 10k", http("POST", "/v1/batch/network/details/", {
+            "networks": [{"ip_address": ip, "mask_prefix": 24} for ip in batch_ips]}), 20),
+        Scenario("GET /v1/articles/search/", http("GET", "/v1/articles/search/?q=content&language=en"),
+                 skip=search_skip),
+        Scenario("GET /v1/forms/export/ csv", http("GET", "/v1/forms/export/"), 20),
+        Scenario("GET /v1/forms/export/ ndjson", http("GET", "/v1/forms/export/?output=ndjson"), 20),
+        # The get_* scenarios are cache hits after the first call; the load_* ones are the uncached database path
+        Scenario("crud get_articles (cached)", crud(get_articles, limit=10, page=1)),
+        Scenario("crud load_articles (uncached)", crud(load_articles, limit=10, page=1)),
+        Scenario("crud get_article by id (cached)", crud(get_article, "1")),
+        Scenario("crud load_article by id (uncached)", crud(load_article, "1")),
+        Scenario("crud load_article by url (uncached)", crud(load_article, "article-1")),
+        Scenario("crud get_forms", crud(get_forms, limit=10, page=1)),
+        Scenario("crud get_form", crud(get_form, 1)),
+        Scenario("crud get_admin (cached with CACHE_REDIS_URL)", crud(get_admin, 1)),
+        Scenario("crud load_admin (uncached)", crud(load_admin, 1)),
+        Scenario("crud create_form", crud(create_form, {
+            "fullname": "Benchmark", "email": "benchmark@example.com", "message": "Hello",
+            "metadata": {"ip_address": "127.0.0.1", "language": "en", "location": None}})),
+        Scenario("crud create_article", create_article_scenario(), 100),
+        Scenario("crud update_article", crud(update_article, 1, {
+            "title": {"en": "Article 1 (en)"}, "page": {"description": {"en": "Description 1"}}}), 100),
+        Scenario("crud create_article + delete_article", create_article_scenario(delete=True), 100),
+        # bcrypt dominates these two, so a handful of iterations is enough
+        Scenario("crud login", crud(login, {"username_or_email": "admin", "password": "benchmark"}), 20),
+        Scenario("crud create_admin", create_admin_scenario(), 20),
+    ]
+
+
+async def seed_database(articles: int, forms: int):
+    from database import Base, get_engine
+    from database.crud.admins import create_admin
+    from database.crud.articles import create_article
+    from database.crud.forms import create_form
+    from database.mariadb import models  # noqa: F401
+
+    async with get_engine().begin() as connection:
+        await connection.run_sync(Base.metadata.drop_all)
+        await connection.run_sync(Base.metadata.create_all)
+
+    for article_id in range(1, articles + 1):
+        await create_article(article_payload(f"article-{article_id}", article_id))
+
+    for form_id in range(1, forms + 1):
+        await create_form({
+            "fullname": f"User {form_id}", "email": f"user{form_id}@example.com", "message": "Hello " * 20,
+            "metadata": {"ip_address": "127.0.0.1", "language": "en", "location": "Kyiv"},
+        })
+
+    await create_admin({"username": "admin", "email": "admin@example.com", "password": "benchmark",
+                        "permissions": ["articles", "forms"]})
+
+
+async def sample_rss(peak: list, stop: asyncio.Event):
+    process = psutil.Process()
+    while not stop.is_set():
+        peak[0] = max(peak[0], process.memory_info().rss)
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=0.005)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def run_scenario(client: httpx.AsyncClient, scenario: Scenario, iterations: int, concurrency: int) -> dict:
+    iterations = min(iterations, scenario.iterations or iterations)
+    await scenario.call(client)
+
+    latencies = []
+    remaining = iter(range(iterations))
+
+    async def worker():
+        for _ in remaining:
+            start_time = time.perf_counter()
+            await scenario.call(client)
+            latencies.append(time.perf_counter() - start_time)
+
+    peak, stop = [psutil.Process().memory_info().rss], asyncio.Event()
+    sampler = asyncio.create_task(sample_rss(peak, stop))
+
+    start_time = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start_time
+
+    stop.set()
+    await sampler
+
+    latencies.sort()
+    return {
+        "iterations": iterations,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+        "rps": iterations / elapsed,
+        "peak_rss_mb": peak[0] / 1024 / 1024,
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+
+        for metric, higher_is_better in (("p50_ms", False), ("p99_ms", False), ("rps", True)):
+            change = (result[metric] - previous[metric]) / previous[metric] if previous[metric] else 0.0
+            if (change < -tolerance) if higher_is_better else (change > tolerance):
+                regressions.append(f"{name}: {metric} {previous[metric]:.2f} -> {result[metric]:.2f} ({change:+.0%})")
+    return regressions
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="In-process latency and throughput benchmark for the Netify API")
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--scenario", action="append", help="Only run scenarios containing this substring")
+    parser.add_argument("--articles", type=int, default=200, help="Articles to seed")
+    parser.add_argument("--forms", type=int, default=1000, help="Contact forms to seed")
+    parser.add_argument("--baseline", help="Baseline JSON to compare against")
+    parser.add_argument("--save-baseline", help="Write results as a new baseline JSON")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression before failing")
+    args = parser.parse_args()
+
+    await seed_database(args.articles, args.forms)
+
+    scenarios = [scenario for scenario in get_scenarios()
+                 if not args.scenario or any(name in scenario.name for name in args.scenario)]
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+
+    results = {}
+    print(f"{'scenario':<50}{'p50 ms':>10}{'p99 ms':>10}{'req/s':>10}{'peak RSS MB':>13}{'vs baseline':>13}")
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None,
+                                     headers={"Api-Key": API_KEY}) as client:
+            for scenario in scenarios:
+                if scenario.skip:
+                    print(f"{scenario.name:<50}skipped: {scenario.skip}")
+                    continue
+
+                result = await run_scenario(client, scenario, args.iterations, args.concurrency)
+                results[scenario.name] = result
+
+                previous = baseline.get(scenario.name)
+                delta = f"{(result['p50_ms'] - previous['p50_ms']) / previous['p50_ms']:+.0%}" if previous else "-"
+                print(f"{scenario.name:<50}{result['p50_ms']:>10.2f}{result['p99_ms']:>10.2f}"
+                      f"{result['rps']:>10.0f}{result['peak_rss_mb']:>13.1f}{delta:>13}")
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as baseline_file:
+            json.dump(results, baseline_file, indent=2)
+
+    regressions = compare(results, baseline, args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,107 @@
+import argparse
+import datetime
+import random
+import timeit
+
+from fastapi.responses import JSONResponse as StarletteJSONResponse
+
+from project.utils import NetworkService
+from project.utils.HealthService import health_sampler
+from project.utils.NetworkService import IPv4Address
+from project.utils.ResponseService import JSONResponse
+from project.utils.SubnetsService import SubnetService, VLSMService
+
+
+class Row:
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+
+
+def get_article_rows(count: int, languages: tuple = ("en", "ru", "uk")):
+    return [
+        Row(article_id=article_id, url=f"article-{article_id}",
+            translation=[Row(language=lang, title=f"Title {article_id} {lang}", content="Lorem ipsum " * 200)
+                         for lang in languages],
+            page=[Row(language=lang, title=f"Page {article_id} {lang}", description="Description " * 10)
+                  for lang in languages])
+        for article_id in range(count)
+    ]
+
+
+def get_form_rows(count: int):
+    return [
+        Row(form_id=form_id, fullname="John Doe", email="john@example.com", message="Hello " * 50,
+            data=Row(ip_address="192.168.1.1", language="en", location="Kyiv", submitted_at=datetime.datetime.now()))
+        for form_id in range(count)
+    ]
+
+
+async def legacy_get_article_dict(article_query):
+    def map_translations(translations, *fields):
+        return {field: {item.language: getattr(item, field) for item in translations} for field in fields}
+
+    article_dict = {
+        "article_id": article_query.article_id,
+        **map_translations(article_query.translation, "title", "content"),
+        "page": map_translations(article_query.page, "title", "description"),
+    }
+    article_dict["page"]["url"] = article_query.url
+    return article_dict
+
+
+def run_coroutine(coroutine):
+    try:
+        coroutine.send(None)
+    except StopIteration as result:
+        return result.value
+
+
+def get_payloads() -> dict:
+    from database.crud.articles import get_article_dict
+    from database.crud.forms import get_form_dict
+
+    random.seed(0)
+    subnets_layout = SubnetService.get_layout("10.0.0.0", 8, 2)
+    batch_details = [
+        NetworkService.from_prefix(IPv4Address(random.getrandbits(32) | 1 << 24), random.randint(1, 32)).get_details()
+        for _ in range(10000)
+    ]
+
+    return {
+        "/v1/health/": health_sampler.get_snapshot(),
+        "/v1/network/details/": NetworkService.from_prefix("192.168.1.1", 24).get_details(),
+        "/v1/network/subnets/ (1024)": SubnetService.build_subnets(subnets_layout, 0, 1024),
+        "/v1/network/subnets/ (65536)": SubnetService.build_subnets(subnets_layout, 0, 65536),
+        "/v1/network/vlsm/ (1000)": run_coroutine(VLSMService.allocate(
+            "10.0.0.0", 8, [{"name": f"segment-{i}", "hosts": random.randint(2, 500)} for i in range(1000)])),
+        "/v1/batch/network/details/ (10000)": {"results": batch_details, "errors": []},
+        "articles list (10)": {"articles": [get_article_dict(row) for row in get_article_rows(10)]},
+        "forms list (100)": {"forms": [get_form_dict(row) for row in get_form_rows(100)]},
+    }
+
+
+def measure(function, number: int) -> float:
+    return min(timeit.repeat(function, number=number, repeat=5)) / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Response serialization cost per endpoint payload")
+    parser.add_argument("--number", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'payload':<40}{'stdlib json, us':>18}{'orjson, us':>14}{'speedup':>10}")
+    for name, payload in get_payloads().items():
+        before = measure(lambda: StarletteJSONResponse(payload), args.number)
+        after = measure(lambda: JSONResponse(payload), args.number)
+        print(f"{name:<40}{before:>18.1f}{after:>14.1f}{before / after:>9.1f}x")
+
+    from database.crud.articles import get_article_dict
+
+    rows = get_article_rows(100)
+    before = measure(lambda: [run_coroutine(legacy_get_article_dict(row)) for row in rows], args.number)
+    after = measure(lambda: [get_article_dict(row) for row in rows], args.number)
+    print(f"{'article row mapping (100)':<40}{before:>18.1f}{after:>14.1f}{before / after:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
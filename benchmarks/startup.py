@@ -0,0 +1,85 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that must stay out of app startup: they are only needed by specific routes or background work
+DEFERRED_MODULES = ("psutil", "numpy", "sqlalchemy", "bcrypt", "jwt", "pymysql", "aiomysql", "pypdf")
+
+STARTUP_CODE = """
+import sys, time
+start_time = time.perf_counter()
+from app import app
+elapsed = time.perf_counter() - start_time
+print(elapsed)
+print(",".join(name for name in {deferred!r} if name in sys.modules))
+"""
+
+
+def run_startup(python: str, env: dict) -> tuple[float, list[str], str]:
+    result = subprocess.run(
+        [python, "-X", "importtime", "-c", STARTUP_CODE.format(deferred=DEFERRED_MODULES)],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+    elapsed, loaded = result.stdout.split("\n")[:2]
+    return float(elapsed), [name for name in loaded.split(",") if name], result.stderr
+
+
+def get_app_imports(stderr: str) -> list[tuple[int, str]]:
+    # Lines read "import time: self [us] | cumulative | name", children are printed before their parent and
+    # indented two spaces deeper, so the modules app imports directly are the depth-1 lines right before "app"
+    children = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        if depth == 0:
+            if name.strip() == "app":
+                return children
+            children = []
+        elif depth == 1:
+            children.append((int(cumulative), name.strip()))
+    return children
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Cold import time of the Netify app with a budget check")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=float(os.getenv("STARTUP_BUDGET_MS", 1500)),
+                        help="Fail when the median import of app:app takes longer than this")
+    parser.add_argument("--top", type=int, default=15, help="Slowest imports made by app.py to list")
+    args = parser.parse_args()
+
+    env = {**os.environ, "PYTHONDONTWRITEBYTECODE": "1"}
+    env.pop("MARIADB_URL", None)
+
+    timings, loaded, stderr = [], [], ""
+    for _ in range(args.runs):
+        elapsed, loaded, stderr = run_startup(sys.executable, env)
+        timings.append(elapsed * 1000)
+
+    median = statistics.median(timings)
+    print(f"import app:app  median {median:.1f} ms  min {min(timings):.1f} ms  max {max(timings):.1f} ms  "
+          f"({args.runs} runs, budget {args.budget_ms:.0f} ms)")
+
+    print(f"\n{'cumulative ms':>14}  module")
+    for cumulative, name in sorted(get_app_imports(stderr), reverse=True)[:args.top]:
+        print(f"{cumulative / 1000:>14.1f}  {name}")
+
+    failures = []
+    if median > args.budget_ms:
+        failures.append(f"median import time {median:.1f} ms exceeds the {args.budget_ms:.0f} ms budget")
+    if loaded:
+        failures.append(f"deferred modules imported at startup: {', '.join(loaded)}")
+
+    for failure in failures:
+        print(f"FAIL {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1 +1 @@
-from .mariadb import engine, async_session, Base
+from .mariadb import init_engine, get_engine, dispose_engine, async_session, async_read_session, Base
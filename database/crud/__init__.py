@@ -0,0 +1,29 @@
+import os
+import time
+from typing import Optional
+
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+class CountCache:
+    # Row totals are served from memory and adjusted by this worker's own writes; the TTL bounds how long
+    # writes made by other workers stay invisible
+    def __init__(self, ttl: float = float(os.getenv("CRUD_COUNT_CACHE_TTL", 60))):
+        self.ttl = ttl
+        self.value: Optional[int] = None
+        self.expires_at = 0.0
+
+    async def get(self, session_db: AsyncSession, statement: Select) -> int:
+        if self.value is None or time.monotonic() >= self.expires_at:
+            total_query = await session_db.execute(statement)
+            self.value = total_query.scalar()
+            self.expires_at = time.monotonic() + self.ttl
+        return self.value
+
+    def adjust(self, delta: int):
+        if self.value is not None:
+            self.value = max(0, self.value + delta)
+
+    def invalidate(self):
+        self.value = None
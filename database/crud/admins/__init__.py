@@ -1,18 +1,38 @@
-import bcrypt
+import os
+from typing import Optional
+
 from fastapi import HTTPException
 from pydantic import validate_email
 from pydantic_core import PydanticCustomError
 from pymysql import err
-from sqlalchemy import select
+from sqlalchemy import delete, insert, select, update
 from sqlalchemy.exc import SQLAlchemyError
 
 from sqlalchemy.orm import selectinload
-from database import async_session
+from database import async_read_session, async_session
 from database.mariadb.models import Admins, AdminsPermissions
 from project.utils import TokenService
+from project.utils.CacheService import CacheConfig, get_cache_backend
+from project.utils.PasswordService import PasswordService
+
+
+class AdminsCacheConfig:
+    TTL = float(os.getenv("ADMINS_CACHE_TTL", 300))
+    SIZE = int(os.getenv("ADMINS_CACHE_SIZE", 1024))
+    # Permissions are authorization data: a revoke has to reach every worker at once, which only the shared backend
+    # can do, so with the per-process memory backend admins are always read from the database
+    ENABLED = bool(CacheConfig.REDIS_URL)
+
+
+admins_cache = get_cache_backend(maxsize=AdminsCacheConfig.SIZE, ttl=AdminsCacheConfig.TTL, namespace="admins")
 
 
-async def get_admin_dict(admin_query):
+async def invalidate_admin_cache(admin_id: int):
+    if AdminsCacheConfig.ENABLED:
+        await admins_cache.delete(f"id:{admin_id}")
+
+
+def get_admin_dict(admin_query):
     return {
         "admin_id": admin_query.admin_id,
         "username": admin_query.username,
@@ -22,8 +42,20 @@ async def get_admin_dict(admin_query):
 
 
 async def get_admin(admin_id: int):
+    if not AdminsCacheConfig.ENABLED:
+        return await load_admin(admin_id)
+
+    admin = await admins_cache.get(f"id:{admin_id}")
+    if admin is None:
+        admin = await load_admin(admin_id)
+        await admins_cache.set(f"id:{admin_id}", admin)
+
+    return admin
+
+
+async def load_admin(admin_id: int):
     try:
-        async with async_session() as session_db:
+        async with async_read_session() as session_db:
             admin_query = await session_db.execute(select(Admins).options(
                 selectinload(Admins.permissions)
             ).filter_by(admin_id=admin_id))
@@ -32,7 +64,7 @@ async def get_admin(admin_id: int):
             if admin is None:
                 raise HTTPException(status_code=404, detail="Admin not found")
 
-            return await get_admin_dict(admin)
+            return get_admin_dict(admin)
     except (err.MySQLError, SQLAlchemyError) as error:
         print(error)
         await session_db.rollback()
@@ -40,6 +72,8 @@ async def get_admin(admin_id: int):
 
 
 async def create_admin(admin_data: dict):
+    password_hash = await PasswordService.hash_password(admin_data["password"])
+
     try:
         async with async_session() as session_db:
             admin_query = await session_db.execute(select(Admins).filter_by(username=admin_data["username"]))
@@ -51,7 +85,7 @@ async def create_admin(admin_data: dict):
             admin_obj = Admins(
                 username=admin_data["username"],
                 email=admin_data["email"],
-                password_hash=bcrypt.hashpw(admin_data["password"].encode(), bcrypt.gensalt())
+                password_hash=password_hash
             )
             session_db.add(admin_obj)
             await session_db.flush()
@@ -71,28 +105,88 @@ async def create_admin(admin_data: dict):
         raise HTTPException(status_code=500, detail="Database error")
 
 
+async def set_admin_permissions(admin_id: int, permissions: list[str]):
+    try:
+        async with async_session() as session_db:
+            admin_query = await session_db.execute(select(Admins.admin_id).filter_by(admin_id=admin_id))
+            if admin_query.scalar() is None:
+                raise HTTPException(status_code=404, detail="Admin not found")
+
+            await session_db.execute(delete(AdminsPermissions).where(AdminsPermissions.admin_id == admin_id))
+            if permissions:
+                await session_db.execute(insert(AdminsPermissions.__table__), [
+                    {"admin_id": admin_id, "permission": permission} for permission in permissions
+                ])
+            await session_db.commit()
+    except (err.MySQLError, SQLAlchemyError) as error:
+        print(error)
+        await session_db.rollback()
+        raise HTTPException(status_code=500, detail="Database error")
+
+    await invalidate_admin_cache(admin_id)
+    return await get_admin(admin_id)
+
+
+async def authenticate_admin(token: str, permission: Optional[str] = None):
+    # Steady state is two cache hits: the verified token and the admin with their permissions
+    token_service = TokenService()
+    verified = await token_service.check_token(token)
+    if not verified["token_status"]:
+        raise HTTPException(status_code=401, detail=verified["detail"])
+
+    try:
+        admin = await get_admin(verified["token_data"]["admin_id"])
+    except HTTPException as error:
+        if error.status_code == 404:
+            raise HTTPException(status_code=401, detail="Invalid token")
+        raise
+
+    if permission is not None and permission not in admin["permissions"]:
+        raise HTTPException(status_code=403, detail="Permission denied")
+
+    return admin
+
+
 async def login(admin_data: dict):
+    # bcrypt can wait behind the password executor for a while, so no session (or pooled connection) is held across
+    # it: load the hash, verify with the session closed, then save a rehash in a short session of its own
     try:
         async with async_session() as session_db:
+            admin_select = select(Admins.admin_id, Admins.username, Admins.password_hash)
             try:
                 _, email = validate_email(admin_data["username_or_email"])
-                admin_query = await session_db.execute(select(Admins).filter_by(email=email))
+                admin_query = await session_db.execute(admin_select.filter_by(email=email))
             except PydanticCustomError:
                 username = admin_data["username_or_email"]
-                admin_query = await session_db.execute(select(Admins).filter_by(username=username))
+                admin_query = await session_db.execute(admin_select.filter_by(username=username))
 
-            admin = admin_query.scalar()
-            if admin is None:
-                raise HTTPException(status_code=404, detail="User not found")
-
-            if not bcrypt.checkpw(admin_data["password"].encode(), admin.password_hash):
-                raise HTTPException(status_code=401, detail="Incorrect password")
-
-            token_service = TokenService()
-            token = await token_service.generate_token(admin_id=admin.admin_id, username=admin.username)
-
-            return token
+            admin = admin_query.first()
     except (err.MySQLError, SQLAlchemyError) as error:
         print(error)
         await session_db.rollback()
         raise HTTPException(status_code=500, detail="Database error")
+
+    if admin is None:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    if not await PasswordService.verify_password(admin_data["password"], admin.password_hash):
+        raise HTTPException(status_code=401, detail="Incorrect password")
+
+    if PasswordService.needs_rehash(admin.password_hash):
+        password_hash = await PasswordService.hash_password(admin_data["password"])
+        try:
+            async with async_session() as session_db:
+                # Matching the old hash keeps a password changed in the meantime from being overwritten
+                await session_db.execute(update(Admins).where(
+                    Admins.admin_id == admin.admin_id, Admins.password_hash == admin.password_hash
+                ).values(password_hash=password_hash))
+                await session_db.commit()
+        except (err.MySQLError, SQLAlchemyError) as error:
+            # The password was verified; the rehash is retried on the next login
+            print(error)
+            await session_db.rollback()
+
+    token_service = TokenService()
+    token = await token_service.generate_token(admin_id=admin.admin_id, username=admin.username)
+
+    return token
@@ -1,55 +1,174 @@
-from typing import Union
+import os
+from typing import Optional, Union
 
 from fastapi import HTTPException
 from pymysql import err
-from sqlalchemy import select, func
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy import bindparam, delete, insert, select, func, update
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from sqlalchemy.orm import selectinload
 
-from database import async_session
+from database import async_read_session, async_session
+from database.crud import CountCache
 from database.mariadb.models import Articles, ArticlesTranslations, ArticlesPageTranslations
+from project.utils.CacheService import get_cache_backend
 
 
-async def get_article_dict(article_query: Articles):
-    def map_translations(translations, *fields):
-        return {field: {item.language: getattr(item, field) for item in translations} for field in fields}
+class ArticlesCacheConfig:
+    TTL = float(os.getenv("ARTICLES_CACHE_TTL", 300))
+    SIZE = int(os.getenv("ARTICLES_CACHE_SIZE", 2048))
 
+
+class ArticlesLanguageConfig:
+    FALLBACK_LANGUAGES = [lang for lang in os.getenv("ARTICLES_FALLBACK_LANGUAGES", "en").split(",") if lang]
+
+
+class ArticlesSearchConfig:
+    SNIPPET_LENGTH = int(os.getenv("ARTICLES_SEARCH_SNIPPET_LENGTH", 200))
+
+
+class ArticlesImportConfig:
+    CHUNK_SIZE = int(os.getenv("ARTICLES_IMPORT_CHUNK_SIZE", 1000))
+
+
+articles_count = CountCache()
+articles_cache = get_cache_backend(maxsize=ArticlesCacheConfig.SIZE, ttl=ArticlesCacheConfig.TTL, namespace="articles")
+
+
+async def invalidate_article_cache(article_id: Optional[int] = None, *urls: Optional[str]):
+    keys = [f"url:{url}" for url in urls if url]
+    if article_id is not None:
+        keys.append(f"id:{article_id}")
+
+    await articles_cache.delete(*keys)
+    # Any write can shift listing pages, so listings are dropped wholesale by moving to a new key generation
+    await articles_cache.incr("lists:version")
+
+
+def get_language_chain(language: Optional[str] = None) -> list[str]:
+    if language is None:
+        return []
+    return list(dict.fromkeys([language, *ArticlesLanguageConfig.FALLBACK_LANGUAGES]))
+
+
+def pick_language(article_query: Articles, languages: list[str]) -> Optional[str]:
+    # One language per article: the first in the chain with both the article and its page translated, so title,
+    # content and page never mix languages. Partially translated articles fall back to whichever side exists.
+    article_languages = {item.language for item in article_query.translation}
+    page_languages = {item.language for item in article_query.page}
+
+    for language in languages:
+        if language in article_languages and language in page_languages:
+            return language
+    for language in languages:
+        if language in article_languages or language in page_languages:
+            return language
+    return None
+
+
+def pick_translation(translations: list, languages: list[str], language: Optional[str]) -> list:
+    if not languages:
+        return translations
+    return [item for item in translations if item.language == language]
+
+
+def get_article_options(languages: Optional[list[str]] = None, with_content: bool = True) -> tuple:
+    if not languages:
+        return selectinload(Articles.translation), selectinload(Articles.page)
+
+    # Only the requested language chain is fetched, and list views skip the full article text
+    translation_columns = [ArticlesTranslations.language, ArticlesTranslations.title]
+    if with_content:
+        translation_columns.append(ArticlesTranslations.content)
+
+    return (
+        selectinload(Articles.translation.and_(ArticlesTranslations.language.in_(languages))).load_only(*translation_columns),
+        selectinload(Articles.page.and_(ArticlesPageTranslations.language.in_(languages))),
+    )
+
+
+def get_article_dict(article_query: Articles, languages: Optional[list[str]] = None, with_content: bool = True):
     if article_query:
+        language = pick_language(article_query, languages) if languages else None
+
+        title, content = {}, {}
+        for item in pick_translation(article_query.translation, languages, language):
+            title[item.language] = item.title
+            if with_content:
+                content[item.language] = item.content
+
+        page_title, page_description = {}, {}
+        for item in pick_translation(article_query.page, languages, language):
+            page_title[item.language] = item.title
+            page_description[item.language] = item.description
+
         article_dict = {
             "article_id": article_query.article_id,
-            **map_translations(article_query.translation, "title", "content"),
-            "page": map_translations(article_query.page, "title", "description"),
+            "title": title,
+            "content": content,
+            "page": {
+                "title": page_title,
+                "description": page_description,
+                "url": article_query.url,
+            },
         }
-        article_dict["page"]["url"] = article_query.url
+
+        if languages:
+            article_dict["language"] = language
+        if not with_content:
+            del article_dict["content"]
+
         return article_dict
 
 
+async def get_articles(limit: int = 10, page: int = 1, after: Optional[int] = None, language: Optional[str] = None):
+    languages = get_language_chain(language)
+    lists_version = await articles_cache.get("lists:version") or 0
+    cache_key = f"list:{lists_version}:{limit}:{page}:{after}:{','.join(languages)}"
+
+    articles = await articles_cache.get(cache_key)
+    if articles is None:
+        articles = await load_articles(limit, page, after, languages)
+        await articles_cache.set(cache_key, articles)
+
+    return articles
+
+
+async def load_articles(limit: int = 10, page: int = 1, after: Optional[int] = None, languages: Optional[list[str]] = None):
+    with_content = not languages
+    articles_select = select(Articles).options(
+        *get_article_options(languages, with_content=with_content)
+    ).order_by(Articles.article_id).limit(limit)
+
+    # Keyset mode seeks past the last seen primary key, so deep pages cost the same as the first one
+    if after is not None:
+        articles_select = articles_select.where(Articles.article_id > after)
+    else:
+        articles_select = articles_select.offset((page - 1) * limit)
 
-async def get_articles(limit: int = 10, page: int = 1):
-    offset = (page - 1) * limit
     try:
-        async with async_session() as session_db:
-            articles_query = await session_db.execute(select(Articles).options(
-                    selectinload(Articles.translation),
-                    selectinload(Articles.page)
-                ).limit(limit).offset(offset)
-            )
+        async with async_read_session() as session_db:
+            articles_query = await session_db.execute(articles_select)
             articles = articles_query.scalars().all()
-            articles_dict = [await get_article_dict(article) for article in articles]
+            articles_dict = [get_article_dict(article, languages, with_content=with_content) for article in articles]
 
-            total_query = await session_db.execute(select(func.count("*")).select_from(Articles))
-            total = total_query.scalar()
+            total = await articles_count.get(session_db, select(func.count("*")).select_from(Articles))
 
-            if 1 < page > total:
+            if after is None and 1 < page > total:
                 raise HTTPException(status_code=404, detail="Page not found")
 
+            page_dict = {"current": page, "total": (total + limit - 1) // limit}
+            if after is not None:
+                page_dict = {
+                    "after": after,
+                    "next": articles[-1].article_id if len(articles) == limit else None,
+                    "total": page_dict["total"],
+                }
+
             return {
                 "articles": articles_dict,
                 "count": total,
-                "page": {
-                    "current": page,
-                    "total": (total + limit - 1) // limit,
-                }
+                "page": page_dict
             }
     except (err.MySQLError, SQLAlchemyError) as error:
         print(error)
@@ -57,27 +176,100 @@ async def get_articles(limit: int = 10, page: int = 1):
         raise HTTPException(status_code=500, detail="Database error")
 
 
-async def get_article(article_id_or_url: Union[int, str]):
+async def get_article(article_id_or_url: Union[int, str], language: Optional[str] = None):
+    article_id_or_url = str(article_id_or_url)
+    languages = get_language_chain(language)
+    cache_key = f"id:{int(article_id_or_url)}" if article_id_or_url.isdigit() else f"url:{article_id_or_url}"
+
+    # Entries hold every cached language variant of one article, so invalidation stays a delete of the id and url keys
+    variant = ",".join(languages) or "*"
+    article = (await articles_cache.get(cache_key) or {}).get(variant)
+    if article is None:
+        # Every invalidation bumps lists:version; if one landed while this row was loading it may be stale, so it
+        # is returned but not written back
+        generation = await articles_cache.get("lists:version")
+        article = await load_article(article_id_or_url, languages)
+        if await articles_cache.get("lists:version") != generation:
+            return article
+
+        for key in (f"id:{article['article_id']}", f"url:{article['page']['url']}"):
+            variants = await articles_cache.get(key) or {}
+            await articles_cache.set(key, {**variants, variant: article})
+
+    return article
+
+
+async def load_article(article_id_or_url: str, languages: Optional[list[str]] = None):
     try:
-        async with async_session() as session_db:
+        async with async_read_session() as session_db:
             if article_id_or_url.isdigit():
                 article_id = int(article_id_or_url)
                 article_query = await session_db.execute(select(Articles).options(
-                    selectinload(Articles.translation),
-                    selectinload(Articles.page)
+                    *get_article_options(languages)
                 ).filter_by(article_id=article_id))
             else:
                 article_url = article_id_or_url
                 article_query = await session_db.execute(select(Articles).options(
-                    selectinload(Articles.translation),
-                    selectinload(Articles.page)
+                    *get_article_options(languages)
                 ).filter_by(url=article_url))
 
             article = article_query.scalar_one_or_none()
             if article is None:
                 raise HTTPException(status_code=404, detail="Article not found")
 
-            return await get_article_dict(article)
+            return get_article_dict(article, languages)
+    except (err.MySQLError, SQLAlchemyError) as error:
+        print(error)
+        await session_db.rollback()
+        raise HTTPException(status_code=500, detail="Database error")
+
+
+async def search_articles(query: str, language: Optional[str] = None, limit: int = 10, page: int = 1):
+    terms = query.split()
+    if not terms:
+        raise HTTPException(status_code=400, detail="Empty search query")
+
+    # Served by the FULLTEXT(title, content) index; the snippet is cut in SQL around the first term so only a
+    # few hundred characters per hit leave the database
+    score = match(ArticlesTranslations.title, ArticlesTranslations.content, against=query).in_natural_language_mode()
+    snippet_start = func.greatest(func.locate(terms[0], ArticlesTranslations.content) - ArticlesSearchConfig.SNIPPET_LENGTH // 2, 1)
+
+    search_select = select(
+        ArticlesTranslations.article_id,
+        Articles.url,
+        ArticlesTranslations.language,
+        ArticlesTranslations.title,
+        func.substring(ArticlesTranslations.content, snippet_start, ArticlesSearchConfig.SNIPPET_LENGTH).label("snippet"),
+        score.label("score"),
+    ).join(Articles, Articles.article_id == ArticlesTranslations.article_id).where(score)
+
+    if language is not None:
+        search_select = search_select.where(ArticlesTranslations.language == language)
+
+    search_select = search_select.order_by(score.desc(), ArticlesTranslations.article_id).limit(limit + 1).offset((page - 1) * limit)
+
+    try:
+        async with async_read_session() as session_db:
+            search_query = await session_db.execute(search_select)
+            rows = search_query.all()
+
+            return {
+                "results": [
+                    {
+                        "article_id": row.article_id,
+                        "url": row.url,
+                        "language": row.language,
+                        "title": row.title,
+                        "snippet": row.snippet,
+                        "score": float(row.score),
+                    }
+                    for row in rows[:limit]
+                ],
+                "page": {
+                    "current": page,
+                    "next": page + 1 if len(rows) > limit else None,
+                }
+            }
     except (err.MySQLError, SQLAlchemyError) as error:
         print(error)
         await session_db.rollback()
@@ -120,6 +312,8 @@ async def create_article(article_data: dict):
                 session_db.add_all([translation_obj, page_translation_obj])
 
             await session_db.commit()
+            articles_count.adjust(1)
+            await invalidate_article_cache(article_obj.article_id, article_url)
 
             return article_data
     except (err.MySQLError, SQLAlchemyError) as error:
@@ -128,6 +322,119 @@ async def create_article(article_data: dict):
         raise HTTPException(status_code=500, detail="Database error")
 
 
+def check_import_item(article_data) -> Optional[str]:
+    # Catches what would otherwise surface as a KeyError halfway through a chunk
+    if not isinstance(article_data, dict) or not isinstance(article_data.get("page"), dict):
+        return "Article must have a page"
+    page_dict = article_data["page"]
+    if not isinstance(page_dict.get("url"), str) or not page_dict["url"]:
+        return "Article page must have a url"
+
+    fields = {"title": article_data.get("title"), "content": article_data.get("content"),
+              "page.title": page_dict.get("title"), "page.description": page_dict.get("description")}
+    for name, translations in fields.items():
+        if not isinstance(translations, dict) or not translations:
+            return f"Article {name} must map languages to text"
+
+    languages = set(fields["title"])
+    for name, translations in fields.items():
+        if set(translations) != languages:
+            return f"Article {name} languages do not match the title"
+        for lang, text in translations.items():
+            if not isinstance(lang, str) or not 0 < len(lang) <= 5 or not isinstance(text, str):
+                return f"Invalid article {name} translation: {lang}"
+    return None
+
+
+async def import_chunk(chunk: list[tuple[int, dict]]) -> tuple[int, list[dict]]:
+    chunk_urls = [article_data["page"]["url"] for _, article_data in chunk]
+
+    try:
+        async with async_session() as session_db:
+            await session_db.execute(insert(Articles.__table__), [{"url": url} for url in chunk_urls])
+            ids_query = await session_db.execute(
+                select(Articles.url, Articles.article_id).where(Articles.url.in_(chunk_urls))
+            )
+            article_ids = dict(ids_query.all())
+
+            translations, page_translations = [], []
+            for url, (_, article_data) in zip(chunk_urls, chunk):
+                page_dict = article_data["page"]
+                for lang in article_data["title"].keys():
+                    translations.append({
+                        "article_id": article_ids[url],
+                        "language": lang,
+                        "title": article_data["title"][lang],
+                        "content": article_data["content"][lang],
+                    })
+                    page_translations.append({
+                        "article_id": article_ids[url],
+                        "language": lang,
+                        "title": page_dict["title"][lang],
+                        "description": page_dict["description"][lang],
+                    })
+
+            await session_db.execute(insert(ArticlesTranslations.__table__), translations)
+            await session_db.execute(insert(ArticlesPageTranslations.__table__), page_translations)
+            await session_db.commit()
+            return len(chunk), []
+    except (err.MySQLError, SQLAlchemyError) as error:
+        await session_db.rollback()
+        if len(chunk) == 1:
+            print(error)
+            # A url taken between the conflict check and this insert is the one failure a valid item can hit
+            detail = "Article url is already taken" if isinstance(error, IntegrityError) else "Database error"
+            return 0, [{"index": chunk[0][0], "url": chunk_urls[0], "detail": detail}]
+
+    # Halve the failed chunk until the rows the database refuses are isolated, so the rest still goes in
+    middle = len(chunk) // 2
+    imported, conflicts = await import_chunk(chunk[:middle])
+    imported_rest, conflicts_rest = await import_chunk(chunk[middle:])
+    return imported + imported_rest, conflicts + conflicts_rest
+
+
+async def import_articles(articles_data: list[dict], chunk_size: int = ArticlesImportConfig.CHUNK_SIZE):
+    # Bulk counterpart of create_article: invalid items and conflicting urls are reported per item and the rest is
+    # inserted in chunks, one transaction and three executemany INSERTs per chunk
+    conflicts, seen_urls = [], set()
+    checked = []
+    for index, article_data in enumerate(articles_data):
+        detail = check_import_item(article_data)
+        if detail is not None:
+            page_dict = article_data.get("page") if isinstance(article_data, dict) else None
+            url = page_dict.get("url") if isinstance(page_dict, dict) else None
+            conflicts.append({"index": index, "url": url if isinstance(url, str) else None, "detail": detail})
+            continue
+        checked.append((index, article_data))
+
+    urls = [article_data["page"]["url"] for _, article_data in checked]
+    try:
+        async with async_session() as session_db:
+            taken_query = await session_db.execute(select(Articles.url).where(Articles.url.in_(urls)))
+            taken_urls = set(taken_query.scalars().all())
+    except (err.MySQLError, SQLAlchemyError) as error:
+        print(error)
+        raise HTTPException(status_code=500, detail="Database error")
+
+    accepted = []
+    for url, (index, article_data) in zip(urls, checked):
+        if url in taken_urls or url in seen_urls:
+            conflicts.append({"index": index, "url": url, "detail": "Article url is already taken"})
+            continue
+        seen_urls.add(url)
+        accepted.append((index, article_data))
+
+    imported = 0
+    for start in range(0, len(accepted), chunk_size):
+        chunk_imported, chunk_conflicts = await import_chunk(accepted[start:start + chunk_size])
+        imported += chunk_imported
+        conflicts.extend(chunk_conflicts)
+
+    articles_count.adjust(imported)
+    await invalidate_article_cache()
+    return {"imported": imported, "conflicts": sorted(conflicts, key=lambda conflict: conflict["index"])}
+
+
 async def update_article(article_id: int, article_data: dict):
     try:
         async with async_session() as session_db:
@@ -142,6 +449,8 @@ async def update_article(article_id: int, article_data: dict):
             if not article:
                 raise HTTPException(status_code=404, detail="Article not found")
 
+            previous_url = article.url
+
             for translation in article.translation:
                 if "title" in article_data:
                     if translation.language in article_data["title"]:
@@ -165,42 +474,119 @@ async def update_article(article_id: int, article_data: dict):
                         article.url = article_data["page"]["url"]
 
             await session_db.commit()
-            return await get_article_dict(article)
+            await invalidate_article_cache(article_id, previous_url, article.url)
+            return get_article_dict(article)
     except (err.MySQLError, SQLAlchemyError) as error:
         print(error)
         await session_db.rollback()
         raise HTTPException(status_code=500, detail="Database error")
 
 
-async def delete_article(article_id: int):
+async def update_articles(articles_data: list[dict]):
+    # Set-based counterpart of update_article: one executemany UPDATE per table and column set, no ORM objects loaded
+    article_ids = {article_data["article_id"] for article_data in articles_data}
+    new_urls = {article_data["article_id"]: article_data["page"]["url"]
+                for article_data in articles_data if "url" in article_data.get("page", {})}
+
+    if len(set(new_urls.values())) != len(new_urls):
+        raise HTTPException(status_code=409, detail="Article url is already taken")
+
     try:
         async with async_session() as session_db:
-            article_query = await session_db.execute(
-                select(Articles).options(
-                    selectinload(Articles.translation),
-                    selectinload(Articles.page)
-                ).filter_by(article_id=article_id)
+            urls_query = await session_db.execute(
+                select(Articles.article_id, Articles.url).where(
+                    Articles.article_id.in_(article_ids) | Articles.url.in_(new_urls.values())
+                )
             )
-            article = article_query.scalar_one_or_none()
-
-            if article is None:
-                raise HTTPException(status_code=404, detail="Article not found")
+            urls = urls_query.all()
 
-            for item in article.translation:
-                await session_db.delete(item)
+            previous_urls = {article_id: url for article_id, url in urls if article_id in article_ids}
+            taken_urls = set(new_urls.values())
+            if any(new_urls.get(article_id) != url for article_id, url in urls if url in taken_urls):
+                raise HTTPException(status_code=409, detail="Article url is already taken")
 
-            for item in article.page:
-                await session_db.delete(item)
+            updates = {}
+            for article_data in articles_data:
+                if article_data["article_id"] not in previous_urls:
+                    continue
+
+                for table, source, columns in (
+                    (ArticlesTranslations, article_data, ("title", "content")),
+                    (ArticlesPageTranslations, article_data.get("page", {}), ("title", "description")),
+                ):
+                    languages = {lang for column in columns for lang in source.get(column, {})}
+                    for lang in languages:
+                        values = {column: source[column][lang] for column in columns if lang in source.get(column, {})}
+                        updates.setdefault((table, tuple(values)), []).append(
+                            {"b_article_id": article_data["article_id"], "b_language": lang,
+                             **{f"b_{column}": value for column, value in values.items()}}
+                        )
+
+            for (table, columns), params in updates.items():
+                await session_db.execute(
+                    update(table.__table__).where(
+                        table.article_id == bindparam("b_article_id"),
+                        table.language == bindparam("b_language"),
+                    ).values({column: bindparam(f"b_{column}") for column in columns}),
+                    params
+                )
+
+            url_params = [{"b_article_id": article_id, "b_url": url}
+                          for article_id, url in new_urls.items() if article_id in previous_urls]
+            if url_params:
+                await session_db.execute(
+                    update(Articles.__table__).where(Articles.article_id == bindparam("b_article_id"))
+                    .values(url=bindparam("b_url")),
+                    url_params
+                )
 
-            await session_db.delete(article)
             await session_db.commit()
-            return await get_articles()
+
+            for article_id, url in previous_urls.items():
+                await invalidate_article_cache(article_id, url, new_urls.get(article_id))
+            return {"updated": len(previous_urls)}
+    except (err.MySQLError, SQLAlchemyError) as error:
+        print(error)
+        await session_db.rollback()
+        raise HTTPException(status_code=500, detail="Database error")
+
+
+async def delete_articles(article_ids: list[int]):
+    try:
+        async with async_session() as session_db:
+            urls_query = await session_db.execute(
+                select(Articles.article_id, Articles.url).where(Articles.article_id.in_(article_ids))
+            )
+            urls = urls_query.all()
+
+            if urls:
+                found_ids = [article_id for article_id, _ in urls]
+                # The FKs cascade on databases created from the current models; the explicit child deletes keep
+                # older schemas without ON DELETE CASCADE working
+                await session_db.execute(delete(ArticlesTranslations).where(ArticlesTranslations.article_id.in_(found_ids)))
+                await session_db.execute(
+                    delete(ArticlesPageTranslations).where(ArticlesPageTranslations.article_id.in_(found_ids))
+                )
+                await session_db.execute(delete(Articles).where(Articles.article_id.in_(found_ids)))
+                await session_db.commit()
+
+            articles_count.adjust(-len(urls))
+            for article_id, url in urls:
+                await invalidate_article_cache(article_id, url)
+            return {"deleted": len(urls)}
     except (err.MySQLError, SQLAlchemyError) as error:
         print(error)
         await session_db.rollback()
         raise HTTPException(status_code=500, detail="Database error")
 
 
+async def delete_article(article_id: int):
+    deleted = await delete_articles([article_id])
+    if not deleted["deleted"]:
+        raise HTTPException(status_code=404, detail="Article not found")
+    return deleted
+
+
 async def check_article_url(url: str):
     try:
         async with async_session() as session_db:
@@ -1,51 +1,97 @@
+import asyncio
+import csv
 import datetime
+import io
+import os
+import time
+from typing import AsyncIterator, Optional
 
 from fastapi import HTTPException
 from pymysql import err
-from sqlalchemy import select, func
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy import delete, insert, select, func
+from sqlalchemy.exc import InterfaceError, OperationalError, SQLAlchemyError
 from sqlalchemy.orm import selectinload
 
-from database import async_session
+from database import async_read_session, async_session
+from database.crud import CountCache
 from database.mariadb.models import Forms, FormsMetadata
+from project.utils.MetricsService import metrics_registry
+from project.utils.ResponseService import encode
 
+forms_count = CountCache()
 
-async def get_form_dict(form_query: Forms):
+
+class FormsWriterConfig:
+    ENABLED = os.getenv("FORMS_WRITE_BEHIND") == "1"
+    QUEUE_SIZE = int(os.getenv("FORMS_QUEUE_SIZE", 10000))
+    BATCH_SIZE = int(os.getenv("FORMS_BATCH_SIZE", 500))
+    FLUSH_INTERVAL = float(os.getenv("FORMS_FLUSH_INTERVAL", 0.5))
+    MAX_RETRY_DELAY = float(os.getenv("FORMS_MAX_RETRY_DELAY", 30))
+    DRAIN_TIMEOUT = float(os.getenv("FORMS_DRAIN_TIMEOUT", 30))
+    RETRY_AFTER = os.getenv("FORMS_RETRY_AFTER", "5")
+
+
+class FormsExportConfig:
+    YIELD_PER = int(os.getenv("FORMS_EXPORT_YIELD_PER", 1000))
+
+
+forms_write_dropped_total = metrics_registry.counter(
+    "forms_write_dropped_total", "Queued contact forms the database rejected on their own")
+
+# Column limits of contact_forms / contact_forms_metadata, checked before a queued form is acknowledged
+FORM_FIELDS = {"fullname": 100, "email": 70, "message": None}
+FORM_METADATA_FIELDS = {"ip_address": 15, "language": 5, "location": 150}
+
+FORMS_EXPORT_COLUMNS = ("form_id", "fullname", "email", "message", "ip_address", "language", "location", "submitted_at")
+
+
+def get_form_dict(form_query: Forms):
     if form_query:
+        metadata = form_query.data
         return {
             "form_id": form_query.form_id,
             "fullname": form_query.fullname,
             "email": form_query.email,
             "message": form_query.message,
             "metadata": {
-                "ip_address": form_query.data.ip_address,
-                "language": form_query.data.language,
-                "location": form_query.data.location,
-                "submitted_at": str(form_query.data.submitted_at),
+                "ip_address": metadata.ip_address,
+                "language": metadata.language,
+                "location": metadata.location,
+                "submitted_at": str(metadata.submitted_at),
             }
         }
 
 
-async def get_forms(limit: int = 10, page: int = 1):
-    offset = (page - 1) * limit
+async def get_forms(limit: int = 10, page: int = 1, after: Optional[int] = None):
+    forms_select = select(Forms).options(
+        selectinload(Forms.data)
+    ).order_by(Forms.form_id).limit(limit)
+
+    if after is not None:
+        forms_select = forms_select.where(Forms.form_id > after)
+    else:
+        forms_select = forms_select.offset((page - 1) * limit)
+
     try:
-        async with async_session() as session_db:
-            forms_query = await session_db.execute(select(Forms).options(
-                selectinload(Forms.data)
-            ).limit(limit).offset(offset))
+        async with async_read_session() as session_db:
+            forms_query = await session_db.execute(forms_select)
             forms = forms_query.scalars().all()
 
-            total_query = await session_db.execute(select(func.count("*")).select_from(Forms))
-            total = total_query.scalar()
+            total = await forms_count.get(session_db, select(func.count("*")).select_from(Forms))
 
-            forms_dict = [await get_form_dict(form) for form in forms]
+            forms_dict = [get_form_dict(form) for form in forms]
+
+            page_dict = {"current": page, "total": (total + limit - 1) // limit}
+            if after is not None:
+                page_dict = {
+                    "after": after,
+                    "next": forms[-1].form_id if len(forms) == limit else None,
+                    "total": page_dict["total"],
+                }
 
             return {
                 "forms": forms_dict,
-                "page": {
-                    "current": page,
-                    "total": (total + limit - 1) // limit,
-                }
+                "page": page_dict
             }
     except (err.MySQLError, SQLAlchemyError) as error:
         print(error)
@@ -55,7 +101,7 @@ async def get_forms(limit: int = 10, page: int = 1):
 
 async def get_form(form_id: int):
     try:
-        async with async_session() as session_db:
+        async with async_read_session() as session_db:
             form_query = await session_db.execute(select(Forms).options(
                 selectinload(Forms.data)
             ).filter_by(form_id=form_id))
@@ -64,7 +110,7 @@ async def get_form(form_id: int):
             if form is None:
                 raise HTTPException(status_code=404, detail="Form not found")
 
-            return await get_form_dict(form)
+            return get_form_dict(form)
     except (err.MySQLError, SQLAlchemyError) as error:
         print(error)
         await session_db.rollback()
@@ -91,6 +137,7 @@ async def create_form(form_data: dict):
             )
             session_db.add(form_metadata_obj)
             await session_db.commit()
+            forms_count.adjust(1)
 
             return form_data
     except (err.MySQLError, SQLAlchemyError) as error:
@@ -99,25 +146,238 @@ async def create_form(form_data: dict):
         raise HTTPException(status_code=500, detail="Database error")
 
 
+async def export_forms(output: str = "csv", submitted_from: Optional[datetime.datetime] = None,
+                       submitted_to: Optional[datetime.datetime] = None) -> AsyncIterator[bytes]:
+    # Plain columns over a server-side cursor: rows are encoded one partition at a time and never held as ORM objects
+    export_select = select(
+        Forms.form_id, Forms.fullname, Forms.email, Forms.message,
+        FormsMetadata.ip_address, FormsMetadata.language, FormsMetadata.location, FormsMetadata.submitted_at
+    ).join(FormsMetadata, FormsMetadata.form_id == Forms.form_id).order_by(Forms.form_id).execution_options(
+        yield_per=FormsExportConfig.YIELD_PER
+    )
+
+    if submitted_from is not None:
+        export_select = export_select.where(FormsMetadata.submitted_at >= submitted_from)
+    if submitted_to is not None:
+        export_select = export_select.where(FormsMetadata.submitted_at < submitted_to)
+
+    # The query starts before the response does, so a database that is down still gets a proper 500
+    session_db = async_read_session()
+    try:
+        result = await session_db.stream(export_select)
+    except (err.MySQLError, SQLAlchemyError) as error:
+        print(error)
+        await session_db.close()
+        raise HTTPException(status_code=500, detail="Database error")
+
+    return stream_forms(session_db, result, output)
+
+
+async def stream_forms(session_db, result, output: str) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    try:
+        if output == "csv":
+            writer.writerow(FORMS_EXPORT_COLUMNS)
+            yield buffer.getvalue().encode()
+
+        async for rows in result.partitions():
+            if output == "csv":
+                buffer.seek(0)
+                buffer.truncate()
+                writer.writerows(rows)
+                yield buffer.getvalue().encode()
+            else:
+                yield b"".join(encode(dict(zip(FORMS_EXPORT_COLUMNS, row))) + b"\n" for row in rows)
+    except (err.MySQLError, SQLAlchemyError) as error:
+        # Headers are already sent: log and end the stream, the truncated body is all the client can be told
+        print(f"Forms export aborted: {error}")
+    finally:
+        await session_db.close()
+
+
+def normalize_form(form_data: dict) -> dict:
+    # Flattens a submission into one insert row, rejecting anything the tables would not accept
+    row = {}
+    for field, max_length in FORM_FIELDS.items():
+        value = form_data.get(field)
+        if not isinstance(value, str) or not value or (max_length and len(value) > max_length):
+            raise HTTPException(status_code=422, detail=f"Invalid form field: {field}")
+        row[field] = value
+
+    metadata = form_data.get("metadata") or {}
+    if not isinstance(metadata, dict):
+        raise HTTPException(status_code=422, detail="Invalid form field: metadata")
+    for field, max_length in FORM_METADATA_FIELDS.items():
+        value = metadata.get(field)
+        if value is not None and (not isinstance(value, str) or len(value) > max_length):
+            raise HTTPException(status_code=422, detail=f"Invalid form field: metadata.{field}")
+        row[field] = value
+
+    return row
+
+
+class FormsWriter:
+    # Write-behind ingestion: submissions are acknowledged once queued and a single background task inserts them
+    # in batches, so a traffic spike costs one connection instead of one per submission
+    def __init__(self, queue_size: int = FormsWriterConfig.QUEUE_SIZE, batch_size: int = FormsWriterConfig.BATCH_SIZE,
+                 flush_interval: float = FormsWriterConfig.FLUSH_INTERVAL):
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    async def start(self):
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._task = asyncio.create_task(self._run())
+        self._task.add_done_callback(self._on_exit)
+
+    def _on_exit(self, task: asyncio.Task):
+        # _run never returns on its own; if it dies anyway, stop acknowledging forms nothing would write and let
+        # submit_form fall back to direct inserts
+        if self._task is task:
+            self._task = None
+            if not task.cancelled():
+                print(f"Forms writer exited unexpectedly: {task.exception()!r}")
+
+    async def stop(self, timeout: float = FormsWriterConfig.DRAIN_TIMEOUT):
+        if self._task is None:
+            return
+
+        task, self._task = self._task, None
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=timeout)
+        except asyncio.TimeoutError:
+            print(f"Forms writer stopped with {self._queue.qsize()} unsaved forms")
+
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    def enqueue(self, form_data: dict) -> dict:
+        if self._task is None:
+            raise HTTPException(status_code=503, detail="Form ingestion is not running")
+
+        row = normalize_form(form_data)
+        try:
+            self._queue.put_nowait({**row, "submitted_at": datetime.datetime.now()})
+        except asyncio.QueueFull:
+            raise HTTPException(status_code=503, detail="Too many form submissions",
+                                headers={"Retry-After": FormsWriterConfig.RETRY_AFTER})
+
+        return form_data
+
+    async def _next_batch(self) -> list:
+        batch = [await self._queue.get()]
+        deadline = time.monotonic() + self.flush_interval
+
+        while len(batch) < self.batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._next_batch()
+            try:
+                await self._write(batch)
+            except Exception as error:
+                print(f"Forms writer failed on a batch of {len(batch)}: {error!r}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _write(self, batch: list):
+        # Connection problems are retried with backoff for as long as it takes, the bounded queue pushing back on
+        # submitters meanwhile. Anything else is about the rows themselves, so the batch is bisected until the
+        # rows the database refuses are isolated and only those are dropped.
+        delay = 0.5
+        while True:
+            try:
+                await insert_forms(batch)
+                return
+            except (OperationalError, InterfaceError, err.OperationalError, err.InterfaceError) as error:
+                print(f"Forms writer retrying in {delay}s: {error}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, FormsWriterConfig.MAX_RETRY_DELAY)
+            except Exception as error:
+                if len(batch) == 1:
+                    forms_write_dropped_total.inc()
+                    print(f"Dropped a queued form the database rejected: {error}")
+                    return
+                middle = len(batch) // 2
+                await self._write(batch[:middle])
+                await self._write(batch[middle:])
+                return
+
+
+async def insert_forms(batch: list):
+    async with async_session() as session_db:
+        forms = [Forms(fullname=row["fullname"], email=row["email"], message=row["message"]) for row in batch]
+        session_db.add_all(forms)
+        await session_db.flush()
+
+        await session_db.execute(insert(FormsMetadata), [
+            {
+                "form_id": form_obj.form_id,
+                "ip_address": row["ip_address"],
+                "language": row["language"],
+                "location": row["location"],
+                "submitted_at": row["submitted_at"],
+            }
+            for form_obj, row in zip(forms, batch)
+        ])
+        await session_db.commit()
+        forms_count.adjust(len(batch))
+
+
+forms_writer = FormsWriter()
+
+
+async def submit_form(form_data: dict):
+    if forms_writer.running:
+        return forms_writer.enqueue(form_data)
+    return await create_form(form_data)
+
+
 # async def update_form(form_id: int, form_data: dict):
 #     return form_data
 
 
-async def delete_form(form_id: int):
+async def delete_forms(form_ids: list[int]):
     try:
         async with async_session() as session_db:
-            form_query = await session_db.execute(select(Forms).options(selectinload(Forms.data)).filter_by(form_id=form_id))
-            form = form_query.scalar_one_or_none()
-
-            if form is None:
-                raise HTTPException(status_code=404, detail="Form not found")
-
-            await session_db.delete(form)
-            await session_db.delete(form.data)
+            await session_db.execute(delete(FormsMetadata).where(FormsMetadata.form_id.in_(form_ids)))
+            result = await session_db.execute(delete(Forms).where(Forms.form_id.in_(form_ids)))
             await session_db.commit()
+            forms_count.adjust(-result.rowcount)
 
-            return await get_forms()
+            return {"deleted": result.rowcount}
     except (err.MySQLError, SQLAlchemyError) as error:
         print(error)
         await session_db.rollback()
         raise HTTPException(status_code=500, detail="Database error")
+
+
+async def delete_form(form_id: int):
+    deleted = await delete_forms([form_id])
+    if not deleted["deleted"]:
+        raise HTTPException(status_code=404, detail="Form not found")
+    return deleted
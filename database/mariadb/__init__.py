@@ -1,24 +1,192 @@
+import itertools
 import os
+import time
+from contextvars import ContextVar
+from typing import Callable, Optional
 
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy import make_url
+from sqlalchemy.exc import InterfaceError, OperationalError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from sqlalchemy.sql import text
 
 
-engine = create_async_engine(os.getenv("MARIADB_URL"), echo=True)
-async_session = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+class DatabaseConfig:
+    URL = os.getenv("MARIADB_URL")
+    ECHO = os.getenv("DB_ECHO") == "1"
+    POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 10))
+    MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+    POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+    POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "1") == "1"
+    POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 10))
+    CONNECT_TIMEOUT = int(os.getenv("DB_CONNECT_TIMEOUT", 5))
+    REPLICA_URLS = [url for url in os.getenv("MARIADB_REPLICA_URLS", "").split(",") if url]
+    REPLICA_RETRY_AFTER = float(os.getenv("DB_REPLICA_RETRY_AFTER", 30))
+    READ_YOUR_WRITES = float(os.getenv("DB_READ_YOUR_WRITES", 5))
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    # Reports how long each checkout waited for a free connection, the one pool figure SQLAlchemy has no event for
+    wait_observer: Optional[Callable[[float], None]] = None
+
+    def _do_get(self):
+        start_time = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            if self.wait_observer is not None:
+                self.wait_observer(time.perf_counter() - start_time)
+
+
+# When the current request (or task) last committed: contextvars keep it per request, so one client's update does not
+# send every other request in the worker to the primary
+last_write: ContextVar[float] = ContextVar("last_write", default=float("-inf"))
+
+
+class ReplicaRouter:
+    # Round-robin over replicas that have not failed recently. Reads fall back to the primary when every replica is
+    # marked down, and for a short window after the current request commits a write, so a read that follows its own
+    # update does not see a lagging replica
+    def __init__(self, retry_after: float = DatabaseConfig.REPLICA_RETRY_AFTER,
+                 read_your_writes: float = DatabaseConfig.READ_YOUR_WRITES):
+        self.retry_after = retry_after
+        self.read_your_writes = read_your_writes
+        self.engines: list[AsyncEngine] = []
+        self.down_until: dict[AsyncEngine, float] = {}
+        self._cycle = itertools.cycle(())
+
+    def configure(self, engines: list[AsyncEngine]):
+        self.engines = engines
+        self.down_until = {}
+        self._cycle = itertools.cycle(engines)
+
+    def mark_down(self, replica: AsyncEngine):
+        print(f"Read replica {replica.url!r} is unavailable, retrying in {self.retry_after}s")
+        self.down_until[replica] = time.monotonic() + self.retry_after
+
+    def get_replica(self) -> Optional[AsyncEngine]:
+        now = time.monotonic()
+        if now - last_write.get() < self.read_your_writes:
+            return None
+
+        for _ in range(len(self.engines)):
+            replica = next(self._cycle)
+            if self.down_until.get(replica, 0.0) <= now:
+                return replica
+        return None
+
+
+class WriteSession(AsyncSession):
+    async def commit(self):
+        await super().commit()
+        last_write.set(time.monotonic())
+
+
+class ReadSession(AsyncSession):
+    # Read-only CRUD functions use this session; if the replica cannot be reached the statement is replayed on
+    # the primary, which is safe because nothing has been written. stream_scalars and scalars go through stream and
+    # execute; a streamed result that fails after its first rows is not replayed
+    async def execute(self, *args, **kwargs):
+        return await self._with_fallback(super().execute, *args, **kwargs)
+
+    async def scalar(self, *args, **kwargs):
+        return await self._with_fallback(super().scalar, *args, **kwargs)
+
+    async def get(self, *args, **kwargs):
+        return await self._with_fallback(super().get, *args, **kwargs)
+
+    async def stream(self, *args, **kwargs):
+        return await self._with_fallback(super().stream, *args, **kwargs)
+
+    async def _with_fallback(self, method, *args, **kwargs):
+        try:
+            return await method(*args, **kwargs)
+        except (OperationalError, InterfaceError):
+            if self.bind is engine:
+                raise
+
+            replica_router.mark_down(self.bind)
+            await self.rollback()
+            self.bind = get_engine()
+            self.sync_session.bind = self.bind.sync_engine
+            return await method(*args, **kwargs)
+
+
+engine: Optional[AsyncEngine] = None
+replica_router = ReplicaRouter()
+session_factory = async_sessionmaker(class_=WriteSession, expire_on_commit=False)
+read_session_factory = async_sessionmaker(class_=ReadSession, expire_on_commit=False)
 Base = declarative_base()
 
 
+def create_engine(url: str) -> AsyncEngine:
+    connect_args = {}
+    if make_url(url).get_backend_name() in ("mysql", "mariadb"):
+        connect_args["connect_timeout"] = DatabaseConfig.CONNECT_TIMEOUT
+
+    return create_async_engine(
+        url,
+        echo=DatabaseConfig.ECHO,
+        poolclass=TimedQueuePool,
+        pool_size=DatabaseConfig.POOL_SIZE,
+        max_overflow=DatabaseConfig.MAX_OVERFLOW,
+        pool_recycle=DatabaseConfig.POOL_RECYCLE,
+        pool_pre_ping=DatabaseConfig.POOL_PRE_PING,
+        pool_timeout=DatabaseConfig.POOL_TIMEOUT,
+        connect_args=connect_args,
+    )
+
+
+def init_engine(url: Optional[str] = None, replica_urls: Optional[list[str]] = None) -> AsyncEngine:
+    global engine
+
+    url = url or os.getenv("MARIADB_URL") or DatabaseConfig.URL
+    if not url:
+        raise RuntimeError("MARIADB_URL is not set")
+
+    engine = create_engine(url)
+    session_factory.configure(bind=engine)
+
+    replica_router.configure([create_engine(replica_url) for replica_url in (
+        replica_urls if replica_urls is not None else DatabaseConfig.REPLICA_URLS
+    )])
+    return engine
+
+
+def get_engine() -> AsyncEngine:
+    # Created on first use when running outside the app lifespan (scripts, benchmarks)
+    return engine if engine is not None else init_engine()
+
+
+async def dispose_engine():
+    global engine
+
+    if engine is not None:
+        for replica in replica_router.engines:
+            await replica.dispose()
+        replica_router.configure([])
+
+        await engine.dispose()
+        engine = None
+
+
+def async_session() -> AsyncSession:
+    get_engine()
+    return session_factory()
+
+
+def async_read_session() -> AsyncSession:
+    primary = get_engine()
+    return read_session_factory(bind=replica_router.get_replica() or primary)
+
+
 async def create_tables():
-    async with engine.begin() as conn:
+    async with get_engine().begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
 
 
 async def check_mariadb_connection():
-    import time
-
     start_time = time.time()
     try:
         async with async_session() as session:
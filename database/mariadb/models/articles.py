@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, Index
 from sqlalchemy.orm import relationship
 
 from database import Base
@@ -10,29 +10,38 @@ class Articles(Base):
     article_id = Column(Integer, primary_key=True, index=True)
     url = Column(Text, unique=True, index=True)
 
-    translation = relationship("ArticlesTranslations", back_populates="article", uselist=True)
-    page = relationship("ArticlesPageTranslations", back_populates="article", uselist=True)
+    translation = relationship("ArticlesTranslations", back_populates="article", uselist=True, passive_deletes=True)
+    page = relationship("ArticlesPageTranslations", back_populates="article", uselist=True, passive_deletes=True)
 
 
 class ArticlesTranslations(Base):
     __tablename__ = "articles_translations"
 
     translation_id = Column(Integer, primary_key=True, index=True)
-    article_id = Column(Integer, ForeignKey("articles.article_id"), index=True)
+    article_id = Column(Integer, ForeignKey("articles.article_id", ondelete="CASCADE"), index=True)
     language = Column(String(5), nullable=False)
     title = Column(Text, nullable=False)
     content = Column(Text, nullable=False)
 
     article = relationship("Articles", back_populates="translation")
 
+    __table_args__ = (
+        Index("ix_articles_translations_article_id_language", "article_id", "language"),
+        Index("ix_articles_translations_fulltext", "title", "content", mysql_prefix="FULLTEXT"),
+    )
+
 
 class ArticlesPageTranslations(Base):
     __tablename__ = "articles_page_translations"
 
     translation_id = Column(Integer, primary_key=True, index=True)
-    article_id = Column(Integer, ForeignKey("articles.article_id"), index=True)
+    article_id = Column(Integer, ForeignKey("articles.article_id", ondelete="CASCADE"), index=True)
     language = Column(String(5), nullable=False)
     title = Column(Text, nullable=False)
     description = Column(Text, nullable=False)
 
     article = relationship("Articles", back_populates="page")
+
+    __table_args__ = (
+        Index("ix_articles_page_translations_article_id_language", "article_id", "language"),
+    )
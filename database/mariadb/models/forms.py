@@ -12,13 +12,13 @@ class Forms(Base):
     email = Column(String(70), nullable=False, index=True)
     message = Column(Text, nullable=False)
 
-    data = relationship("FormsMetadata", back_populates="form", uselist=False)
+    data = relationship("FormsMetadata", back_populates="form", uselist=False, passive_deletes=True)
 
 
 class FormsMetadata(Base):
     __tablename__ = "contact_forms_metadata"
 
-    form_id = Column(Integer, ForeignKey("contact_forms.form_id"), primary_key=True, index=True)
+    form_id = Column(Integer, ForeignKey("contact_forms.form_id", ondelete="CASCADE"), primary_key=True, index=True)
     ip_address = Column(String(15), nullable=True, default=None)
     language = Column(String(5), nullable=True, default=None)
     location = Column(String(150), nullable=True, default=None)
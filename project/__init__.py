@@ -1,44 +1,94 @@
 import os
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, APIRouter
 from fastapi.middleware.cors import CORSMiddleware
 
-# from .middlewares import APIKeyMiddleware
+from .middlewares import AdmissionControlMiddleware, APIKeyMiddleware, MetricsMiddleware
+from .middlewares.admission_control import AdmissionConfig
+from .middlewares.check_api_key import APIKeyConfig
+from .utils.ResponseService import JSONResponse
+from .utils.HealthService import health_sampler
+from .utils.MetricsService import instrument_engine
 
 
-# @asynccontextmanager
-# async def lifespan(app_class: FastAPI):
-#     from .database.mariadb import models
-#
-#     await create_tables()
-#     yield
+@asynccontextmanager
+async def lifespan(app_class: FastAPI):
+    # from .database.mariadb import models
+    #
+    # await create_tables()
+    database, forms_writer = None, None
+    if os.getenv("MARIADB_URL"):
+        import database
+        instrument_engine(database.get_engine())
+        for index, replica in enumerate(database.mariadb.replica_router.engines):
+            instrument_engine(replica, name=f"replica-{index}")
 
+        # Imported only with a database configured: the writer has nothing to write to otherwise
+        from database.crud.forms import FormsWriterConfig
+        if FormsWriterConfig.ENABLED:
+            from database.crud.forms import forms_writer
+            await forms_writer.start()
 
-app = FastAPI(
-    title="Netify API",
-    debug=True if os.getenv("API_MODE") == "DEV" else False,
-    docs_url="/",
-    redoc_url="/redoc" if os.getenv("MODE") == "DEV" else None,
-    # lifespan=lifespan
-)
+    await health_sampler.start()
+    yield
+    await health_sampler.stop()
 
-origins = ["*"]
+    if forms_writer is not None:
+        await forms_writer.stop()
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=origins,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+    if database is not None:
+        await database.dispose_engine()
 
-router = APIRouter()
 
-router_v1 = APIRouter(prefix="/v1")
+def create_app() -> FastAPI:
+    app = FastAPI(
+        title="Netify API",
+        debug=True if os.getenv("API_MODE") == "DEV" else False,
+        docs_url="/",
+        redoc_url="/redoc" if os.getenv("MODE") == "DEV" else None,
+        lifespan=lifespan,
+        default_response_class=JSONResponse
+    )
 
-from .routes import health, network, mask, ip
+    origins = ["*"]
 
-router.include_router(router_v1)
-app.include_router(router)
+    if APIKeyConfig.ENABLED:
+        app.add_middleware(APIKeyMiddleware)
 
-# app.add_middleware(APIKeyMiddleware)
+    if AdmissionConfig.ENABLED:
+        app.add_middleware(AdmissionControlMiddleware)
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=origins,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+    app.add_middleware(MetricsMiddleware)
+
+    from .routes.articles import articles_router
+    from .routes.batch import batch_router
+    from .routes.forms import forms_router
+    from .routes.health import health_router
+    from .routes.ip import ip_router
+    from .routes.mask import mask_router
+    from .routes.metrics import metrics_router
+    from .routes.network import network_router
+
+    router_v1 = APIRouter(prefix="/v1")
+    router_v1.include_router(health_router)
+    router_v1.include_router(network_router)
+    router_v1.include_router(mask_router)
+    router_v1.include_router(ip_router)
+    router_v1.include_router(batch_router)
+    router_v1.include_router(articles_router)
+
+    # Contact forms hold personal data, so the export is only served behind the API key check
+    if APIKeyConfig.ENABLED:
+        router_v1.include_router(forms_router)
+
+    app.include_router(metrics_router)
+    app.include_router(router_v1)
+    return app
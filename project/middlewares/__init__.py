@@ -1 +1,3 @@
+from .admission_control import AdmissionControlMiddleware
 from .check_api_key import APIKeyMiddleware
+from .metrics import MetricsMiddleware
@@ -0,0 +1,153 @@
+import json
+import math
+import os
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from project.utils.MetricsService import metrics_registry
+from project.utils.ResponseService import JSONResponse
+
+# Keys are path prefixes, the longest match wins and "" covers everything else. rate/burst are per client token
+# buckets (requests per second / bucket size), concurrency caps in-flight requests per worker across all clients.
+# Either can be left out of a route to skip that check.
+DEFAULT_LIMITS = {
+    "": {"rate": 50, "burst": 100},
+    "/v1/network/subnets/": {"rate": 5, "burst": 20, "concurrency": 4},
+    "/v1/network/vlsm/": {"rate": 5, "burst": 20, "concurrency": 4},
+    "/v1/batch/": {"rate": 5, "burst": 20, "concurrency": 4},
+    "/v1/forms/export/": {"rate": 0.1, "burst": 2, "concurrency": 1},
+}
+
+
+def load_limits(overrides: dict) -> dict:
+    # Overrides are merged per route, so {"/v1/batch/": {"concurrency": 8}} keeps that route's rate and burst
+    limits = {route: {**DEFAULT_LIMITS.get(route, {}), **route_limits} for route, route_limits in overrides.items()}
+    limits = {**DEFAULT_LIMITS, **limits}
+    for route, route_limits in limits.items():
+        if "rate" in route_limits and (route_limits["rate"] <= 0 or route_limits.get("burst", 0) < 1):
+            raise ValueError(f"ADMISSION_LIMITS for {route!r} needs a rate above 0 and a burst of at least 1")
+    return limits
+
+
+class AdmissionConfig:
+    # Off unless asked for: behind a proxy every client shares the proxy's address (and so one bucket) until
+    # ADMISSION_TRUSTED_HOPS is set to the number of proxies in front of the app
+    ENABLED = os.getenv("ADMISSION_CONTROL") == "1"
+    LIMITS = load_limits(json.loads(os.getenv("ADMISSION_LIMITS", "{}")))
+    MAX_CLIENTS = int(os.getenv("ADMISSION_MAX_CLIENTS", 100000))
+    TRUSTED_HOPS = int(os.getenv("ADMISSION_TRUSTED_HOPS", 0))
+    EXEMPT_PATHS = frozenset(path for path in os.getenv("ADMISSION_EXEMPT_PATHS", "/v1/health/,/metrics").split(",") if path)
+
+
+admission_rejected_total = metrics_registry.counter(
+    "admission_rejected_total", "Requests rejected by admission control", ("route", "reason"))
+admission_in_flight = metrics_registry.gauge(
+    "admission_in_flight", "Requests in flight on concurrency-capped routes", ("route",))
+admission_tracked_clients = metrics_registry.gauge(
+    "admission_tracked_clients", "Client token buckets currently held in memory")
+
+
+class TokenBuckets:
+    # One [tokens, updated_at] pair per (client, route) in LRU order. A bucket left idle for burst / rate seconds
+    # is full again, which is what a missing bucket means, so idle entries can be dropped from the old end.
+    def __init__(self, limits: dict, max_clients: int = AdmissionConfig.MAX_CLIENTS):
+        self.limits = limits
+        self.max_clients = max_clients
+        self._buckets = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def take(self, key: tuple) -> float:
+        # Returns 0 when a token was taken, otherwise the seconds until one is available
+        rate, burst = self.limits[key[1]]["rate"], self.limits[key[1]]["burst"]
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [burst, now]
+        else:
+            bucket[0] = min(burst, bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+            self._buckets.move_to_end(key)
+
+        self._evict(now)
+
+        if bucket[0] >= 1:
+            bucket[0] -= 1
+            return 0.0
+        return (1 - bucket[0]) / rate
+
+    def _evict(self, now: float):
+        while len(self._buckets) > self.max_clients:
+            self._buckets.popitem(last=False)
+
+        for _ in range(2):
+            key, (tokens, updated_at) = next(iter(self._buckets.items()))
+            limits = self.limits[key[1]]
+            if now - updated_at < limits["burst"] / limits["rate"]:
+                break
+            del self._buckets[key]
+
+
+class AdmissionControlMiddleware:
+    def __init__(self, app: ASGIApp, limits: Optional[dict] = None,
+                 exempt_paths=AdmissionConfig.EXEMPT_PATHS, trusted_hops: int = AdmissionConfig.TRUSTED_HOPS):
+        self.app = app
+        self.limits = limits or AdmissionConfig.LIMITS
+        self.prefixes = sorted(self.limits, key=len, reverse=True)
+        self.exempt_paths = frozenset(exempt_paths)
+        self.trusted_hops = trusted_hops
+        self.buckets = TokenBuckets(self.limits)
+        self.in_flight = dict.fromkeys(self.limits, 0)
+        metrics_registry.add_collector(lambda: admission_tracked_clients.set(value=len(self.buckets)))
+
+    def get_client(self, scope: Scope) -> str:
+        # Each trusted proxy appends the address it received the request from, so the client is the entry that many
+        # hops from the right; anything further left was sent by the client and can be forged
+        if self.trusted_hops:
+            forwarded = [entry.strip() for name, value in scope["headers"] if name == b"x-forwarded-for"
+                         for entry in value.split(b",")]
+            if len(forwarded) >= self.trusted_hops:
+                return forwarded[-self.trusted_hops].decode("latin-1")
+        client = scope.get("client")
+        return client[0] if client else ""
+
+    async def reject(self, scope: Scope, receive: Receive, send: Send, route: str, reason: str, status_code: int,
+                     retry_after: float):
+        admission_rejected_total.inc(route or "*", reason)
+        response = JSONResponse({"error": "Too Many Requests" if status_code == 429 else "Service Unavailable"},
+                                status_code=status_code, headers={"Retry-After": str(max(1, math.ceil(retry_after)))})
+        await response(scope, receive, send)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["method"] == "OPTIONS" or scope["path"] in self.exempt_paths:
+            return await self.app(scope, receive, send)
+
+        path = scope["path"]
+        route = next((prefix for prefix in self.prefixes if path.startswith(prefix)), None)
+        if route is None:
+            return await self.app(scope, receive, send)
+        limits = self.limits[route]
+
+        if "rate" in limits:
+            wait = self.buckets.take((self.get_client(scope), route))
+            if wait:
+                return await self.reject(scope, receive, send, route, "rate_limit", 429, wait)
+
+        concurrency = limits.get("concurrency")
+        if concurrency is None:
+            return await self.app(scope, receive, send)
+
+        if self.in_flight[route] >= concurrency:
+            return await self.reject(scope, receive, send, route, "concurrency", 503, 1)
+
+        self.in_flight[route] += 1
+        admission_in_flight.set(route, value=self.in_flight[route])
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.in_flight[route] -= 1
+            admission_in_flight.set(route, value=self.in_flight[route])
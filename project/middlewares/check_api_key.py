@@ -1,20 +1,113 @@
+import hashlib
 import os
+import time
+from typing import Iterable, Optional
 
-from fastapi import Request
-from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+from starlette.types import ASGIApp, Receive, Scope, Send
 
-VALID_API_KEY = os.getenv("API_KEY")
+from project.utils.MetricsService import metrics_registry
+from project.utils.ResponseService import JSONResponse
 
 
-class APIKeyMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        if request.method == "OPTIONS":
-            return await call_next(request)
+class APIKeyConfig:
+    KEYS = [key for key in os.getenv("API_KEYS", os.getenv("API_KEY", "")).split(",") if key]
+    KEYS_FILE = os.getenv("API_KEYS_FILE")
+    RELOAD_INTERVAL = float(os.getenv("API_KEYS_RELOAD_INTERVAL", 5))
+    EXEMPT_PATHS = frozenset(path for path in os.getenv("API_KEY_EXEMPT_PATHS", "/v1/health/").split(",") if path)
+    ENABLED = bool(KEYS or KEYS_FILE)
 
-        api_key = request.headers.get("API-KEY")
 
-        if not api_key == VALID_API_KEY:
-            return JSONResponse({"error": "Forbidden"}, status_code=403)
+api_key_requests_total = metrics_registry.counter(
+    "api_key_requests_total", "Requests authorised per API key id", ("key_id",))
+api_key_rejected_total = metrics_registry.counter(
+    "api_key_rejected_total", "Requests rejected for a missing or unknown API key")
 
-        return await call_next(request)
+
+def hash_api_key(api_key: bytes) -> bytes:
+    return hashlib.sha256(api_key).digest()
+
+
+class APIKeyStore:
+    def __init__(self, keys: Iterable[str] = (), keys_file: Optional[str] = None, reload_interval: float = 5):
+        self.keys_file = keys_file
+        self.reload_interval = reload_interval
+        self._static_digests = {hash_api_key(key.strip().encode()) for key in keys}
+        self._digests = {}
+        self._file_mtime = None
+        self._next_check = 0.0
+        self.reload()
+
+    def _read_keys_file(self) -> set[bytes]:
+        # One key per line: either the raw key or "sha256:<hex digest>" so plaintext keys never need to be on disk
+        digests = set()
+        with open(self.keys_file) as keys_file:
+            for line in keys_file:
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                if line.startswith("sha256:"):
+                    digests.add(bytes.fromhex(line[7:]))
+                else:
+                    digests.add(hash_api_key(line.encode()))
+        return digests
+
+    def reload(self):
+        digests = set(self._static_digests)
+        if self.keys_file:
+            try:
+                self._file_mtime = os.stat(self.keys_file).st_mtime_ns
+                digests |= self._read_keys_file()
+            except (OSError, ValueError) as error:
+                print(f"API keys file error: {error}")
+                return
+
+        self._digests = {digest: digest.hex()[:12] for digest in digests}
+
+    def _maybe_reload(self):
+        now = time.monotonic()
+        if now < self._next_check:
+            return
+        self._next_check = now + self.reload_interval
+
+        try:
+            mtime = os.stat(self.keys_file).st_mtime_ns
+        except OSError:
+            return
+        if mtime != self._file_mtime:
+            self.reload()
+
+    def match(self, api_key: Optional[bytes]) -> Optional[str]:
+        if self.keys_file:
+            self._maybe_reload()
+        if not api_key:
+            return None
+
+        # Lookup is by SHA-256 digest, so timing depends on the digest rather than on how much of the key matches
+        return self._digests.get(hash_api_key(api_key))
+
+
+class APIKeyMiddleware:
+    def __init__(self, app: ASGIApp, key_store: Optional[APIKeyStore] = None,
+                 exempt_paths: Iterable[str] = APIKeyConfig.EXEMPT_PATHS):
+        self.app = app
+        self.key_store = key_store or APIKeyStore(APIKeyConfig.KEYS, APIKeyConfig.KEYS_FILE, APIKeyConfig.RELOAD_INTERVAL)
+        self.exempt_paths = frozenset(exempt_paths)
+        self.forbidden_response = JSONResponse({"error": "Forbidden"}, status_code=403)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["method"] == "OPTIONS" or scope["path"] in self.exempt_paths:
+            return await self.app(scope, receive, send)
+
+        api_key = None
+        for name, value in scope["headers"]:
+            if name == b"api-key":
+                api_key = value
+                break
+
+        key_id = self.key_store.match(api_key)
+        if key_id is None:
+            api_key_rejected_total.inc()
+            return await self.forbidden_response(scope, receive, send)
+
+        api_key_requests_total.inc(key_id)
+        await self.app(scope, receive, send)
@@ -0,0 +1,37 @@
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from project.utils.MetricsService import http_requests_total, http_requests_in_flight, http_request_duration_seconds
+
+
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        method = scope["method"]
+        status_code = 500
+        start_time = time.perf_counter()
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        http_requests_in_flight.inc(method)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_requests_in_flight.dec(method)
+
+            # FastAPI stores the matched APIRoute in the shared scope, so the template is known once routing ran
+            route = scope.get("route")
+            route_path = getattr(route, "path", "unmatched")
+
+            http_requests_total.inc(method, route_path, status_code)
+            http_request_duration_seconds.observe(method, route_path, value=time.perf_counter() - start_time)
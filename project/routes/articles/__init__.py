@@ -0,0 +1,16 @@
+from typing import Optional
+
+from fastapi import APIRouter, Query
+
+articles_router = APIRouter(prefix="/articles", tags=["Articles"])
+
+
+@articles_router.get("/search/")
+async def articles_search_endpoint(q: str = Query(..., min_length=2, max_length=200),
+                                   language: Optional[str] = Query(None, max_length=5),
+                                   limit: int = Query(10, ge=1, le=50),
+                                   page: int = Query(1, ge=1, le=100)):
+    # Imported on first use: the CRUD layer itself imports project.utils, so a module-level import would be circular
+    from database.crud.articles import search_articles
+
+    return await search_articles(query=q, language=language, limit=limit, page=page)
@@ -0,0 +1,50 @@
+from fastapi import APIRouter
+
+from project.routes.batch.dto import IPAddressesBatch, BinaryIPAddressesBatch, MaskPrefixesBatch, MaskIPsBatch, NetworkDetailsBatch
+from project.utils.ResponseService import JSONResponse
+
+batch_router = APIRouter(prefix="/batch", tags=["Batch"])
+
+
+@batch_router.post("/ip/bin/")
+async def batch_ip_to_binary_endpoint(batch_data: IPAddressesBatch):
+    # Imported on first use: BatchService pulls in NumPy, which would otherwise load with the app
+    from project.utils.BatchService import BatchService
+
+    results = await BatchService.ips_to_binary(batch_data.ip_addresses)
+    return JSONResponse(status_code=200, content=results)
+
+
+@batch_router.post("/ip/dec/")
+async def batch_binary_ip_to_dec_endpoint(batch_data: BinaryIPAddressesBatch):
+    from project.utils.BatchService import BatchService
+
+    results = await BatchService.binaries_to_ip(batch_data.ip_addresses_bin)
+    return JSONResponse(status_code=200, content=results)
+
+
+@batch_router.post("/mask/prefix/")
+async def batch_prefix_to_mask_endpoint(batch_data: MaskPrefixesBatch):
+    from project.utils.BatchService import BatchService
+
+    results = await BatchService.prefixes_to_mask_ip(batch_data.prefixes)
+    return JSONResponse(status_code=200, content=results)
+
+
+@batch_router.post("/mask/ip/")
+async def batch_mask_to_prefix_endpoint(batch_data: MaskIPsBatch):
+    from project.utils.BatchService import BatchService
+
+    results = await BatchService.masks_ip_to_prefix(batch_data.masks_ip)
+    return JSONResponse(status_code=200, content=results)
+
+
+@batch_router.post("/network/details/")
+async def batch_network_details_endpoint(batch_data: NetworkDetailsBatch):
+    from project.utils.BatchService import BatchService
+
+    results = await BatchService.networks_details(
+        ip_addresses=[network.ip_address for network in batch_data.networks],
+        mask_prefixes=[network.mask_prefix for network in batch_data.networks],
+    )
+    return JSONResponse(status_code=200, content=results)
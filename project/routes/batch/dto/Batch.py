@@ -0,0 +1,84 @@
+import os
+
+from pydantic import BaseModel, Field
+
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", 100000))
+
+
+class IPAddressesBatch(BaseModel):
+    ip_addresses: list[str] = Field(..., max_length=BATCH_MAX_ITEMS)
+
+    model_config = {
+        "json_schema_extra": {
+            "examples": [
+                {
+                    "ip_addresses": ["192.168.1.1", "10.0.0.1"]
+                }
+            ]
+        }
+    }
+
+
+class BinaryIPAddressesBatch(BaseModel):
+    ip_addresses_bin: list[str] = Field(..., max_length=BATCH_MAX_ITEMS)
+
+    model_config = {
+        "json_schema_extra": {
+            "examples": [
+                {
+                    "ip_addresses_bin": ["11000000101010000000000100000001"]
+                }
+            ]
+        }
+    }
+
+
+class MaskPrefixesBatch(BaseModel):
+    prefixes: list[int] = Field(..., max_length=BATCH_MAX_ITEMS)
+
+    model_config = {
+        "json_schema_extra": {
+            "examples": [
+                {
+                    "prefixes": [8, 16, 24]
+                }
+            ]
+        }
+    }
+
+
+class MaskIPsBatch(BaseModel):
+    masks_ip: list[str] = Field(..., max_length=BATCH_MAX_ITEMS)
+
+    model_config = {
+        "json_schema_extra": {
+            "examples": [
+                {
+                    "masks_ip": ["255.255.255.0", "255.255.0.0"]
+                }
+            ]
+        }
+    }
+
+
+class NetworkDetailsBatchItem(BaseModel):
+    ip_address: str
+    # Bounded to 32-bit integers only: prefixes outside 1-32 are reported per item rather than failing the batch
+    mask_prefix: int = Field(..., ge=-2 ** 31, le=2 ** 31 - 1)
+
+
+class NetworkDetailsBatch(BaseModel):
+    networks: list[NetworkDetailsBatchItem] = Field(..., max_length=BATCH_MAX_ITEMS)
+
+    model_config = {
+        "json_schema_extra": {
+            "examples": [
+                {
+                    "networks": [
+                        {"ip_address": "192.168.1.1", "mask_prefix": 24},
+                        {"ip_address": "10.20.30.40", "mask_prefix": 8}
+                    ]
+                }
+            ]
+        }
+    }
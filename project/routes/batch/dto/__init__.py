@@ -0,0 +1 @@
+from .Batch import IPAddressesBatch, BinaryIPAddressesBatch, MaskPrefixesBatch, MaskIPsBatch, NetworkDetailsBatch
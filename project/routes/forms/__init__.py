@@ -0,0 +1,22 @@
+import datetime
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Query
+from fastapi.responses import StreamingResponse
+
+forms_router = APIRouter(prefix="/forms", tags=["Forms"])
+
+
+@forms_router.get("/export/")
+async def forms_export_endpoint(output: Literal["csv", "ndjson"] = Query("csv"),
+                                submitted_from: Optional[datetime.datetime] = Query(None),
+                                submitted_to: Optional[datetime.datetime] = Query(None)):
+    # Imported on first use: the CRUD layer itself imports project.utils, so a module-level import would be circular
+    from database.crud.forms import export_forms
+
+    rows = await export_forms(output=output, submitted_from=submitted_from, submitted_to=submitted_to)
+    return StreamingResponse(
+        rows,
+        media_type="text/csv" if output == "csv" else "application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="forms.{output}"'},
+    )
@@ -1,30 +1,25 @@
-from fastapi import Path, APIRouter
-from fastapi.responses import JSONResponse
+from fastapi import Path, APIRouter, Request
 
-from project import router_v1
-from project.utils.NetworkService import IPConverter
+from project.utils.HTTPCacheService import cached_response, prebuild
+from project.utils.NetworkService import IPConverter, PREFIX_TO_MASK, MASK_TO_PREFIX
 
 mask_router = APIRouter(prefix="/mask", tags=["Mask"])
 
+PREFIX_RESPONSES = {prefix: prebuild({"ip_mask": ip_mask}) for prefix, ip_mask in enumerate(PREFIX_TO_MASK) if prefix >= 1}
+MASK_RESPONSES = {mask_ip: prebuild({"prefix": prefix}) for mask_ip, prefix in MASK_TO_PREFIX.items()}
 
-@mask_router.get("/prefix/{prefix}/")
-async def mask_to_cidr_endpoint(prefix: int = Path(..., ge=1, le=32)):
-    ip_converter = IPConverter()
-    ip_mask = await ip_converter.prefix_to_mask_ip(prefix)
 
-    return JSONResponse(status_code=200, content={
-        "ip_mask": ip_mask,
-    })
+@mask_router.get("/prefix/{prefix}/")
+async def mask_to_cidr_endpoint(request: Request, prefix: int = Path(..., ge=1, le=32)):
+    return cached_response(PREFIX_RESPONSES[prefix], request)
 
 
 @mask_router.get("/ip/{mask_ip}/")
-async def mask_to_cidr_endpoint(mask_ip: str):
-    ip_converter = IPConverter()
-    prefix = await ip_converter.mask_ip_to_prefix(mask_ip)
-
-    return JSONResponse(status_code=200, content={
-        "prefix": prefix,
-    })
-
-
-router_v1.include_router(mask_router)
+async def mask_to_cidr_endpoint(request: Request, mask_ip: str):
+    cached = MASK_RESPONSES.get(mask_ip)
+    if cached is None:
+        ip_converter = IPConverter()
+        prefix = await ip_converter.mask_ip_to_prefix(mask_ip)
+        cached = MASK_RESPONSES[PREFIX_TO_MASK[prefix]]
+
+    return cached_response(cached, request)
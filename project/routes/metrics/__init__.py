@@ -0,0 +1,11 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from project.utils.MetricsService import metrics_registry
+
+metrics_router = APIRouter(tags=["General"])
+
+
+@metrics_router.get("/metrics", response_class=PlainTextResponse)
+async def metrics_endpoint():
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4")
@@ -1,37 +1,22 @@
-from fastapi import HTTPException
-from fastapi.responses import JSONResponse
+from functools import lru_cache
+
+from fastapi import Request
 
 from project.routes.network import network_router
 from project.routes.network.dto import NetworkDetails
 
 from project.utils import NetworkService
-from project.utils.NetworkService import IPConverter
-
+from project.utils.HTTPCacheService import CachedBody, HTTPCacheConfig, cached_response, prebuild
+from project.utils.NetworkService import IPv4Address
 
-@network_router.post("/details/")
-async def network_details_endpoint(network_data: NetworkDetails):
-    ip_converter = IPConverter()
-    subnet_mask = await ip_converter.prefix_to_mask_ip(network_data.mask_prefix)
 
-    network_service = NetworkService(ip=network_data.ip_address, subnet_mask=subnet_mask)
+@lru_cache(maxsize=HTTPCacheConfig.RESULTS_CACHE_SIZE)
+def get_network_details(ip_address: int, mask_prefix: int) -> CachedBody:
+    network_service = NetworkService.from_prefix(ip=IPv4Address(ip_address), mask_prefix=mask_prefix)
+    return prebuild(network_service.get_details())
 
-    network_ip = await network_service.get_network_address()
-    network_hosts = await network_service.get_hosts()
-    network_broadcast = await network_service.get_broadcast_address()
 
-    ip_class = await network_service.get_ip_class()
-    ip_status = await network_service.get_ip_status()
-
-    return JSONResponse(status_code=200, content={
-        "ip": {
-            "address": network_data.ip_address,
-            "ip_class": ip_class,
-            "ip_status": ip_status,
-        },
-        "network": {
-            "ip": network_ip,
-            "hosts": network_hosts,
-            "broadcast": network_broadcast,
-            "subnet_mask": subnet_mask,
-        },
-    })
\ No newline at end of file
+@network_router.post("/details/")
+async def network_details_endpoint(request: Request, network_data: NetworkDetails):
+    ip_address = IPv4Address.from_string(network_data.ip_address)
+    return cached_response(get_network_details(ip_address.value, network_data.mask_prefix), request)
\ No newline at end of file
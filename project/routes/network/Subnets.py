@@ -1,13 +1,45 @@
-from fastapi.responses import JSONResponse
+from functools import lru_cache
+from typing import Literal, Optional
+
+from fastapi import Query, Request
+from fastapi.responses import StreamingResponse
 from project.routes.network import network_router
 from project.routes.network.dto import Subnets
+from project.utils.HTTPCacheService import CachedBody, HTTPCacheConfig, cached_response, prebuild
+from project.utils.NetworkService import IPv4Address
 from project.utils.SubnetsService import SubnetService
 
 
+@lru_cache(maxsize=HTTPCacheConfig.RESULTS_CACHE_SIZE)
+def get_subnets_page(network_ip: int, mask_prefix: int, usable_hosts: int, offset: int, limit: Optional[int]) -> CachedBody:
+    layout = SubnetService.get_layout(IPv4Address.format(network_ip), mask_prefix, usable_hosts)
+    return prebuild(SubnetService.build_subnets(layout, offset, limit))
+
+
 @network_router.post("/subnets/")
-async def network_subnets_endpoint(subnets_data: Subnets):
+async def network_subnets_endpoint(request: Request, subnets_data: Subnets):
+    subnet_service = SubnetService()
+    layout = subnet_service.get_layout(network_ip_address=subnets_data.network_ip_address,
+                                       mask_prefix=subnets_data.mask_prefix, hosts_per_subnet=subnets_data.hosts_per_subnet)
+
+    # Requests are normalised to the resulting layout, so different host counts that round to the same split share an entry
+    page_size = min(subnets_data.limit or layout["num_subnets"], layout["num_subnets"] - subnets_data.offset)
+    if page_size <= HTTPCacheConfig.RESULTS_CACHE_MAX_ITEMS:
+        cached = get_subnets_page(layout["network_ip"], subnets_data.mask_prefix, layout["usable_hosts"],
+                                  subnets_data.offset, subnets_data.limit)
+    else:
+        cached = prebuild(subnet_service.build_subnets(layout, subnets_data.offset, subnets_data.limit))
+
+    return cached_response(cached, request)
+
+
+@network_router.post("/subnets/stream/")
+async def network_subnets_stream_endpoint(subnets_data: Subnets, output: Literal["json", "ndjson"] = Query("ndjson")):
     subnet_service = SubnetService()
-    subnets = await subnet_service.get_subnets(network_ip_address=subnets_data.network_ip_address, 
-                                               mask_prefix=subnets_data.mask_prefix, hosts_per_subnet=subnets_data.hosts_per_subnet)
+    layout = subnet_service.get_layout(network_ip_address=subnets_data.network_ip_address,
+                                       mask_prefix=subnets_data.mask_prefix, hosts_per_subnet=subnets_data.hosts_per_subnet)
 
-    return JSONResponse(status_code=200, content=subnets)
+    return StreamingResponse(
+        subnet_service.iter_subnets_chunks(layout, ndjson=output == "ndjson"),
+        media_type="application/x-ndjson" if output == "ndjson" else "application/json",
+    )
@@ -0,0 +1,14 @@
+from project.utils.ResponseService import JSONResponse
+from project.routes.network import network_router
+from project.routes.network.dto import VLSM
+from project.utils.SubnetsService import VLSMService
+
+
+@network_router.post("/vlsm/")
+async def network_vlsm_endpoint(vlsm_data: VLSM):
+    vlsm_service = VLSMService()
+    allocation = await vlsm_service.allocate(network_ip_address=vlsm_data.network_ip_address,
+                                             mask_prefix=vlsm_data.mask_prefix,
+                                             requirements=[subnet.model_dump() for subnet in vlsm_data.subnets])
+
+    return JSONResponse(status_code=200, content=allocation)
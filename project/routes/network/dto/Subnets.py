@@ -1,10 +1,16 @@
+from typing import Optional
+
 from pydantic import BaseModel, Field
 
+from project.utils.SubnetsService import SubnetsConfig
+
 
 class Subnets(BaseModel):
     network_ip_address: str
     mask_prefix: int = Field(..., ge=1, le=32)
-    hosts_per_subnet: int
+    hosts_per_subnet: int = Field(..., ge=0)
+    offset: int = Field(0, ge=0)
+    limit: Optional[int] = Field(None, ge=1, le=SubnetsConfig.MAX_PAGE_SIZE)
 
     model_config = {
         "json_schema_extra": {
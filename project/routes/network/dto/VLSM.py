@@ -0,0 +1,30 @@
+import os
+
+from pydantic import BaseModel, Field
+
+
+class VLSMSubnet(BaseModel):
+    name: str = Field(..., max_length=100)
+    hosts: int = Field(..., ge=0)
+
+
+class VLSM(BaseModel):
+    network_ip_address: str
+    mask_prefix: int = Field(..., ge=1, le=32)
+    subnets: list[VLSMSubnet] = Field(..., min_length=1, max_length=int(os.getenv("VLSM_MAX_SUBNETS", 65536)))
+
+    model_config = {
+        "json_schema_extra": {
+            "examples": [
+                {
+                    "network_ip_address": "192.168.1.0",
+                    "mask_prefix": 24,
+                    "subnets": [
+                        {"name": "office", "hosts": 100},
+                        {"name": "servers", "hosts": 50},
+                        {"name": "wan", "hosts": 2}
+                    ]
+                }
+            ]
+        }
+    }
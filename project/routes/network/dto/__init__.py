@@ -1,2 +1,3 @@
 from .NetworkDetails import NetworkDetails
 from .Subnets import Subnets
+from .VLSM import VLSM
@@ -0,0 +1,130 @@
+import numpy as np
+
+# Index i holds the mask for prefix i; values are strictly increasing, so searchsorted maps a mask to its prefix
+MASKS = np.array([(0xFFFFFFFF << (32 - prefix)) & 0xFFFFFFFF for prefix in range(33)], dtype=np.uint32)
+
+
+class BatchService:
+
+    @staticmethod
+    def parse_ips(ip_addresses: list[str]) -> tuple[np.ndarray, np.ndarray]:
+        values = np.zeros(len(ip_addresses), dtype=np.uint32)
+        valid = np.ones(len(ip_addresses), dtype=bool)
+
+        for index, ip_address in enumerate(ip_addresses):
+            try:
+                a, b, c, d = map(int, ip_address.split("."))
+                if not (0 <= a <= 255 and 0 <= b <= 255 and 0 <= c <= 255 and 0 <= d <= 255):
+                    raise ValueError
+                values[index] = (a << 24) | (b << 16) | (c << 8) | d
+            except ValueError:
+                valid[index] = False
+
+        return values, valid
+
+    @staticmethod
+    def parse_prefixes(prefixes: list[int]) -> tuple[np.ndarray, np.ndarray]:
+        # Range-checked in Python: a prefix that does not fit in int64 would make numpy raise for the whole batch
+        valid = np.fromiter((1 <= prefix <= 32 for prefix in prefixes), dtype=bool, count=len(prefixes))
+        values = np.fromiter((prefix if 1 <= prefix <= 32 else 32 for prefix in prefixes), dtype=np.int64,
+                             count=len(prefixes))
+        return values, valid
+
+    @staticmethod
+    def format_ips(values: np.ndarray) -> list[str]:
+        octets = [((values >> shift) & 255).tolist() for shift in (24, 16, 8, 0)]
+        return [f"{a}.{b}.{c}.{d}" for a, b, c, d in zip(*octets)]
+
+    @staticmethod
+    def collect(results: list, valid: np.ndarray, detail: str) -> dict:
+        errors = []
+        for index in np.flatnonzero(~valid).tolist():
+            results[index] = None
+            errors.append({"index": index, "detail": detail})
+
+        return {"results": results, "errors": errors}
+
+    @staticmethod
+    async def ips_to_binary(ip_addresses: list[str]) -> dict:
+        values, valid = BatchService.parse_ips(ip_addresses)
+        results = [{"ip_address_binary": f"{value:032b}"} for value in values.tolist()]
+        return BatchService.collect(results, valid, "Invalid IP address")
+
+    @staticmethod
+    async def binaries_to_ip(ip_addresses_bin: list[str]) -> dict:
+        values = np.zeros(len(ip_addresses_bin), dtype=np.uint32)
+        valid = np.ones(len(ip_addresses_bin), dtype=bool)
+
+        for index, binary in enumerate(ip_addresses_bin):
+            if len(binary) == 32 and not binary.strip("01"):
+                values[index] = int(binary, 2)
+            else:
+                valid[index] = False
+
+        results = [{"ip_address": ip_address} for ip_address in BatchService.format_ips(values)]
+        return BatchService.collect(results, valid, "Invalid binary format")
+
+    @staticmethod
+    async def prefixes_to_mask_ip(prefixes: list[int]) -> dict:
+        prefixes, valid = BatchService.parse_prefixes(prefixes)
+
+        masks = MASKS[prefixes]
+        results = [{"ip_mask": ip_mask} for ip_mask in BatchService.format_ips(masks)]
+        return BatchService.collect(results, valid, "Invalid subnet mask length")
+
+    @staticmethod
+    async def masks_ip_to_prefix(masks_ip: list[str]) -> dict:
+        values, valid = BatchService.parse_ips(masks_ip)
+
+        prefixes = np.minimum(np.searchsorted(MASKS, values), 32)
+        valid &= (MASKS[prefixes] == values) & (prefixes >= 1)
+
+        results = [{"prefix": prefix} for prefix in prefixes.tolist()]
+        return BatchService.collect(results, valid, "Invalid subnet mask")
+
+    @staticmethod
+    async def networks_details(ip_addresses: list[str], mask_prefixes: list[int]) -> dict:
+        values, valid = BatchService.parse_ips(ip_addresses)
+
+        prefixes, valid_prefixes = BatchService.parse_prefixes(mask_prefixes)
+        valid &= valid_prefixes
+
+        masks = MASKS[prefixes]
+        networks = values & masks
+        broadcasts = values | ~masks
+        hosts = (np.int64(1) << (32 - prefixes)) - 2
+
+        first_octets = values >> 24
+        valid &= first_octets != 0
+        ip_classes = np.select(
+            [first_octets < 128, first_octets < 192, first_octets < 224, first_octets < 240],
+            ["A", "B", "C", "D (Multicast)"],
+            "E (Experimental)",
+        )
+        ip_statuses = np.select(
+            [values == 0x7F000001,
+             (first_octets == 10) | ((values >> 20) == 0xAC1) | ((values >> 16) == 0xC0A8)],
+            ["Localhost", "Private"],
+            "Public",
+        )
+
+        results = [
+            {
+                "ip": {
+                    "address": address,
+                    "ip_class": ip_class,
+                    "ip_status": ip_status,
+                },
+                "network": {
+                    "ip": network_ip,
+                    "hosts": network_hosts,
+                    "broadcast": network_broadcast,
+                    "subnet_mask": subnet_mask,
+                },
+            }
+            for address, ip_class, ip_status, network_ip, network_hosts, network_broadcast, subnet_mask in zip(
+                ip_addresses, ip_classes.tolist(), ip_statuses.tolist(), BatchService.format_ips(networks),
+                hosts.tolist(), BatchService.format_ips(broadcasts), BatchService.format_ips(masks),
+            )
+        ]
+        return BatchService.collect(results, valid, "Invalid IP address or mask prefix")
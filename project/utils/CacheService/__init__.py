@@ -0,0 +1,103 @@
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+import orjson
+
+
+class CacheConfig:
+    REDIS_URL = os.getenv("CACHE_REDIS_URL")
+
+
+class TTLCache:
+    # LRU ordered dict with a per-entry deadline; expired entries are dropped lazily on access or eviction
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key, default=None):
+        item = self._data.get(key)
+        if item is None:
+            return default
+
+        value, expires_at = item
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._data[key]
+            return default
+
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key, value, ttl: Optional[float] = None):
+        ttl = self.ttl if ttl is None else ttl
+        self._data[key] = (value, time.monotonic() + ttl if ttl is not None else None)
+        self._data.move_to_end(key)
+
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        item = self._data.pop(key, None)
+        return default if item is None else item[0]
+
+    def clear(self):
+        self._data.clear()
+
+
+class MemoryCacheBackend:
+    # Values are kept as orjson bytes like in Redis, so every get hands out a fresh copy and a caller mutating
+    # the result cannot corrupt the entry for later requests
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    async def get(self, key: str) -> Any:
+        value = self._cache.get(key)
+        return None if value is None else orjson.loads(value)
+
+    async def set(self, key: str, value: Any):
+        self._cache.set(key, orjson.dumps(value))
+
+    async def delete(self, *keys: str):
+        for key in keys:
+            self._cache.pop(key)
+
+    async def incr(self, key: str) -> int:
+        value = (await self.get(key) or 0) + 1
+        self._cache.set(key, orjson.dumps(value), ttl=float("inf"))
+        return value
+
+
+class RedisCacheBackend:
+    # Shared between uvicorn workers; values are stored as orjson bytes and Redis handles expiry and eviction
+    def __init__(self, url: str, ttl: Optional[float] = None, namespace: str = "netify"):
+        import redis.asyncio as redis
+
+        self._redis = redis.from_url(url)
+        self.ttl = ttl
+        self.namespace = namespace
+
+    async def get(self, key: str) -> Any:
+        value = await self._redis.get(f"{self.namespace}:{key}")
+        return None if value is None else orjson.loads(value)
+
+    async def set(self, key: str, value: Any):
+        await self._redis.set(f"{self.namespace}:{key}", orjson.dumps(value),
+                              px=int(self.ttl * 1000) if self.ttl is not None else None)
+
+    async def delete(self, *keys: str):
+        if keys:
+            await self._redis.delete(*(f"{self.namespace}:{key}" for key in keys))
+
+    async def incr(self, key: str) -> int:
+        return await self._redis.incr(f"{self.namespace}:{key}")
+
+
+def get_cache_backend(maxsize: int = 1024, ttl: Optional[float] = None, namespace: str = "netify"):
+    if CacheConfig.REDIS_URL:
+        return RedisCacheBackend(CacheConfig.REDIS_URL, ttl=ttl, namespace=namespace)
+    return MemoryCacheBackend(maxsize=maxsize, ttl=ttl)
@@ -0,0 +1,42 @@
+import hashlib
+import os
+from typing import NamedTuple, Optional
+
+from fastapi import Request
+from fastapi.responses import Response
+
+from project.utils.ResponseService import encode
+
+
+class HTTPCacheConfig:
+    CACHE_CONTROL = os.getenv("HTTP_CACHE_CONTROL", "public, max-age=31536000, immutable")
+    RESULTS_CACHE_SIZE = int(os.getenv("NETWORK_RESULTS_CACHE_SIZE", 1024))
+    RESULTS_CACHE_MAX_ITEMS = int(os.getenv("NETWORK_RESULTS_CACHE_MAX_ITEMS", 1024))
+
+
+class CachedBody(NamedTuple):
+    body: bytes
+    etag: str
+
+
+def prebuild(content) -> CachedBody:
+    body = encode(content)
+    return CachedBody(body=body, etag=f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"')
+
+
+def etag_matches(etag: str, if_none_match: Optional[str]) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+def cached_response(cached: CachedBody, request: Request) -> Response:
+    headers = {"ETag": cached.etag, "Cache-Control": HTTPCacheConfig.CACHE_CONTROL}
+
+    # Only safe methods may answer 304, conditional POSTs still get the full body
+    if request.method in ("GET", "HEAD") and etag_matches(cached.etag, request.headers.get("if-none-match")):
+        return Response(status_code=304, headers=headers)
+
+    return Response(content=cached.body, status_code=200, media_type="application/json", headers=headers)
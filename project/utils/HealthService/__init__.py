@@ -0,0 +1,166 @@
+import asyncio
+import os
+import time
+from typing import Optional
+
+from project.utils.MetricsService import metrics_registry
+
+
+class HealthConfig:
+    SAMPLE_INTERVAL = float(os.getenv("HEALTH_SAMPLE_INTERVAL", 5))
+    CHECK_DATABASE = os.getenv("HEALTH_CHECK_DATABASE") == "1"
+    SMAPS_INTERVAL = float(os.getenv("HEALTH_SMAPS_INTERVAL", 60))
+
+
+process_memory_bytes = metrics_registry.gauge(
+    "process_memory_bytes", "Worker memory: rss, uss (unique to this process), pss and shared with other processes",
+    ("kind",))
+
+
+def get_memory_usage(pid: Optional[int] = None, full: bool = True) -> dict:
+    # uss/pss come from /proc/<pid>/smaps, so they tell apart pages a forked worker owns from the ones it still
+    # shares copy-on-write with the server process. Walking smaps is slow on a large heap; full=False reads rss only
+    import psutil
+
+    if not full:
+        return {"rss": psutil.Process(pid).memory_info().rss}
+
+    memory = psutil.Process(pid).memory_full_info()
+    return {
+        "rss": memory.rss,
+        "uss": memory.uss,
+        "pss": getattr(memory, "pss", memory.uss),
+        "shared": memory.rss - memory.uss,
+    }
+
+
+class ProcessMemory:
+    # rss is read on every call, smaps at most once per SMAPS_INTERVAL; uss/pss keep their last reading in between
+    def __init__(self, smaps_interval: float = HealthConfig.SMAPS_INTERVAL):
+        self.smaps_interval = smaps_interval
+        self.usage = None
+        self.smaps_read_at = float("-inf")
+
+    def read(self) -> dict:
+        now = time.monotonic()
+        if self.usage is None or now - self.smaps_read_at >= self.smaps_interval:
+            self.usage = get_memory_usage(full=True)
+            self.smaps_read_at = now
+        else:
+            rss = get_memory_usage(full=False)["rss"]
+            self.usage = {**self.usage, "rss": rss, "shared": max(0, rss - self.usage["uss"])}
+        return self.usage
+
+
+process_memory = ProcessMemory()
+
+
+def collect_process_memory():
+    for kind, value in process_memory.read().items():
+        process_memory_bytes.set(kind, value=value)
+
+
+metrics_registry.add_collector(collect_process_memory)
+
+
+class HealthSampler:
+    def __init__(self, interval: float = HealthConfig.SAMPLE_INTERVAL, check_database: bool = HealthConfig.CHECK_DATABASE):
+        self.interval = interval
+        self.check_database = check_database
+        self.snapshot = None
+        self.sampled_at = None
+        self._process = None
+        self._task = None
+
+    def _prime(self):
+        # psutil is imported here, which the sampler task runs in the background rather than at import. cpu_percent
+        # with interval=None compares against the previous call, so this first call only sets the baseline
+        import psutil
+
+        if self._process is None:
+            self._process = psutil.Process()
+            psutil.cpu_percent(interval=None)
+            self._process.cpu_percent(interval=None)
+
+    def _sample_system(self) -> dict:
+        import psutil
+
+        # A reading taken right after the baseline covers a few microseconds and means nothing, so it is left out
+        primed = self._process is not None
+        self._prime()
+
+        cpu_percent = psutil.cpu_percent(interval=None)
+        memory = psutil.virtual_memory()
+
+        memory_usage = process_memory.read()
+        with self._process.oneshot():
+            process_cpu_percent = self._process.cpu_percent(interval=None)
+            process_threads = self._process.num_threads()
+
+        return {
+            "cpu": {
+                "used": f"{cpu_percent:.1f}%" if primed else None
+            },
+            "memory": {
+                "total": f"{memory.total / 1024 / 1024 / 1024:.2f} GB",
+                "available": f"{memory.available / 1024 / 1024 / 1024:.2f} GB",
+                "used": f"{memory.used / 1024 / 1024 / 1024:.2f} GB",
+                "percent": f"{memory.percent}%"
+            },
+            "process": {
+                "pid": self._process.pid,
+                "cpu": f"{process_cpu_percent:.1f}%" if primed else None,
+                "memory_rss": f"{memory_usage['rss'] / 1024 / 1024:.2f} MB",
+                "memory_uss": f"{memory_usage['uss'] / 1024 / 1024:.2f} MB",
+                "threads": process_threads
+            }
+        }
+
+    async def sample(self):
+        snapshot = {"api": await asyncio.to_thread(self._sample_system)}
+
+        if self.check_database:
+            from database.mariadb import check_mariadb_connection
+            snapshot["database"] = await check_mariadb_connection()
+
+        self.snapshot = snapshot
+        self.sampled_at = time.monotonic()
+
+    async def _run(self):
+        # The CPU baseline is taken one interval before the first sample, so that sample already has a real reading
+        try:
+            await asyncio.to_thread(self._prime)
+        except Exception as error:
+            print(f"Health sampler error: {error}")
+
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.sample()
+            except Exception as error:
+                print(f"Health sampler error: {error}")
+
+    async def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def get_snapshot(self) -> dict:
+        if self.snapshot is None:
+            self.snapshot = {"api": self._sample_system()}
+            self.sampled_at = time.monotonic()
+
+        return {
+            **self.snapshot,
+            "sample_age": round(time.monotonic() - self.sampled_at, 3),
+        }
+
+
+health_sampler = HealthSampler()
@@ -0,0 +1,174 @@
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Callable
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(label_names: tuple, label_values: tuple, extra: str = "") -> str:
+    labels = [f'{name}="{escape_label(value)}"' for name, value in zip(label_names, label_values)]
+    if extra:
+        labels.append(extra)
+    return "{" + ",".join(labels) + "}" if labels else ""
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: tuple = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Metric:
+    # Values are plain dicts keyed by label tuples. Each worker process owns its registry and the event loop
+    # runs one coroutine at a time, so updates need no locking.
+    def __init__(self, name: str, documentation: str, kind: str, label_names: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.kind = kind
+        self.label_names = label_names
+        self.values = defaultdict(Histogram) if kind == "histogram" else defaultdict(int)
+
+    def inc(self, *label_values, amount: float = 1):
+        self.values[label_values] += amount
+
+    def dec(self, *label_values, amount: float = 1):
+        self.values[label_values] -= amount
+
+    def set(self, *label_values, value: float):
+        self.values[label_values] = value
+
+    def observe(self, *label_values, value: float):
+        self.values[label_values].observe(value)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+        if self.kind != "histogram":
+            for label_values, value in self.values.items():
+                lines.append(f"{self.name}{format_labels(self.label_names, label_values)} {value}")
+            return lines
+
+        for label_values, histogram in self.values.items():
+            cumulative = 0
+            for bound, count in zip(histogram.buckets + ("+Inf",), histogram.counts):
+                cumulative += count
+                bucket_labels = format_labels(self.label_names, label_values, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{format_labels(self.label_names, label_values)} {histogram.sum}")
+            lines.append(f"{self.name}_count{format_labels(self.label_names, label_values)} {histogram.count}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics = {}
+        self.collectors = []
+
+    def _register(self, name: str, documentation: str, kind: str, label_names: tuple) -> Metric:
+        if name not in self.metrics:
+            self.metrics[name] = Metric(name, documentation, kind, label_names)
+        return self.metrics[name]
+
+    def counter(self, name: str, documentation: str, label_names: tuple = ()) -> Metric:
+        return self._register(name, documentation, "counter", label_names)
+
+    def gauge(self, name: str, documentation: str, label_names: tuple = ()) -> Metric:
+        return self._register(name, documentation, "gauge", label_names)
+
+    def histogram(self, name: str, documentation: str, label_names: tuple = ()) -> Metric:
+        return self._register(name, documentation, "histogram", label_names)
+
+    def add_collector(self, collector: Callable[[], None]):
+        # Collectors refresh pull-style gauges (pool sizes, cache sizes) right before rendering
+        self.collectors.append(collector)
+
+    def render(self) -> str:
+        for collector in self.collectors:
+            collector()
+
+        lines = []
+        for metric in self.metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+metrics_registry = MetricsRegistry()
+
+http_requests_total = metrics_registry.counter(
+    "http_requests_total", "HTTP requests by method, route template and status code", ("method", "route", "status"))
+http_requests_in_flight = metrics_registry.gauge(
+    "http_requests_in_flight", "HTTP requests currently being served", ("method",))
+http_request_duration_seconds = metrics_registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency by method and route template", ("method", "route"))
+
+db_queries_total = metrics_registry.counter(
+    "db_queries_total", "Database statements executed by statement type", ("statement",))
+db_query_errors_total = metrics_registry.counter(
+    "db_query_errors_total", "Database statements that raised an error", ("statement",))
+db_query_duration_seconds = metrics_registry.histogram(
+    "db_query_duration_seconds", "Database statement latency by statement type", ("statement",))
+db_pool_size = metrics_registry.gauge("db_pool_size", "Connections the pool keeps open", ("database",))
+db_pool_checked_out = metrics_registry.gauge("db_pool_checked_out", "Pool connections currently in use", ("database",))
+db_pool_overflow = metrics_registry.gauge("db_pool_overflow", "Connections open beyond the pool size", ("database",))
+db_pool_wait_seconds = metrics_registry.histogram(
+    "db_pool_wait_seconds", "Time spent waiting for a pool connection", ("database",))
+
+
+def get_statement_type(statement: str) -> str:
+    return statement.split(None, 1)[0].upper() if statement else "UNKNOWN"
+
+
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info["query_start"] = time.perf_counter()
+
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    statement_type = get_statement_type(statement)
+    db_queries_total.inc(statement_type)
+    db_query_duration_seconds.observe(statement_type, value=time.perf_counter() - conn.info.pop("query_start"))
+
+
+def handle_error(exception_context):
+    db_query_errors_total.inc(get_statement_type(exception_context.statement))
+    if exception_context.connection is not None:
+        exception_context.connection.info.pop("query_start", None)
+
+
+def instrument_engine(engine, name: str = "primary"):
+    from sqlalchemy import event
+
+    sync_engine = getattr(engine, "sync_engine", engine)
+    if event.contains(sync_engine, "before_cursor_execute", before_cursor_execute):
+        return
+
+    event.listen(sync_engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", after_cursor_execute)
+    event.listen(sync_engine, "handle_error", handle_error)
+
+    pool = sync_engine.pool
+    if not hasattr(pool, "checkedout"):
+        return
+
+    if hasattr(pool, "wait_observer"):
+        pool.wait_observer = lambda seconds: db_pool_wait_seconds.observe(name, value=seconds)
+
+    def collect_pool():
+        db_pool_size.set(name, value=pool.size())
+        db_pool_checked_out.set(name, value=pool.checkedout())
+        db_pool_overflow.set(name, value=max(pool.overflow(), 0))
+
+    metrics_registry.add_collector(collect_pool)
@@ -1,109 +1,199 @@
+from typing import Union
+
 from fastapi import HTTPException
 
 
-class IPConverter:
-    @staticmethod
-    async def ip_to_binary(ip_address: str) -> str:
+class IPv4Address:
+    __slots__ = ("value",)
+
+    def __init__(self, value: int):
+        self.value = value
+
+    @classmethod
+    def from_string(cls, ip_address: str) -> "IPv4Address":
         octets = ip_address.split(".")
         if not len(octets) == 4:
             raise HTTPException(status_code=400, detail="Invalid IP address")
 
+        value = 0
         try:
             for octet in octets:
                 octet_int = int(octet)
                 if not (0 <= octet_int <= 255):
                     raise HTTPException(status_code=400, detail="Invalid IP address")
+                value = (value << 8) | octet_int
         except ValueError:
             raise HTTPException(status_code=400, detail="Invalid IP address")
 
-        return "".join(f"{int(octet):08b}" for octet in ip_address.split("."))
+        return cls(value)
+
+    @classmethod
+    def from_binary(cls, binary: str) -> "IPv4Address":
+        if not len(binary) == 32 or binary.strip("01"):
+            raise HTTPException(status_code=400, detail="Invalid binary format")
+        return cls(int(binary, 2))
+
+    @classmethod
+    def from_prefix(cls, prefix: int) -> "IPv4Address":
+        if not (0 <= prefix <= 32):
+            raise HTTPException(status_code=400, detail="Invalid subnet mask length")
+        return cls((0xFFFFFFFF << (32 - prefix)) & 0xFFFFFFFF)
+
+    @staticmethod
+    def format(value: int) -> str:
+        return f"{value >> 24}.{(value >> 16) & 255}.{(value >> 8) & 255}.{value & 255}"
+
+    def __str__(self) -> str:
+        return self.format(self.value)
+
+    def __repr__(self) -> str:
+        return f"IPv4Address('{self}')"
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, IPv4Address) and self.value == other.value
+
+    def __hash__(self) -> int:
+        return hash(self.value)
+
+    @property
+    def binary(self) -> str:
+        return f"{self.value:032b}"
+
+    @property
+    def prefix(self) -> int:
+        # Only meaningful for subnet masks: -1 when the ones are not contiguous
+        ones = self.value.bit_count()
+        if self.value != (0xFFFFFFFF << (32 - ones)) & 0xFFFFFFFF:
+            return -1
+        return ones
+
+    @property
+    def ip_class(self) -> str:
+        first_octet = self.value >> 24
+        if first_octet == 0:
+            raise HTTPException(status_code=400, detail="Invalid IP address")
+        if first_octet < 128:
+            return "A"
+        if first_octet < 192:
+            return "B"
+        if first_octet < 224:
+            return "C"
+        if first_octet < 240:
+            return "D (Multicast)"
+        return "E (Experimental)"
+
+    @property
+    def ip_status(self) -> str:
+        if self.value == 0x7F000001:
+            return "Localhost"
+
+        if (self.value >> 24 == 10) or (self.value >> 20 == 0xAC1) or (self.value >> 16 == 0xC0A8):
+            return "Private"
+
+        return "Public"
+
+
+class IPv4Network:
+    __slots__ = ("address", "mask")
+
+    def __init__(self, address: IPv4Address, mask: IPv4Address):
+        self.address = address
+        self.mask = mask
+
+    @property
+    def network_address(self) -> IPv4Address:
+        return IPv4Address(self.address.value & self.mask.value)
+
+    @property
+    def broadcast_address(self) -> IPv4Address:
+        return IPv4Address(self.address.value | (~self.mask.value & 0xFFFFFFFF))
+
+    @property
+    def hosts(self) -> int:
+        return (1 << (32 - self.mask.value.bit_count())) - 2
+
+
+PREFIX_TO_MASK = tuple(str(IPv4Address.from_prefix(prefix)) for prefix in range(33))
+MASK_TO_PREFIX = {mask_ip: prefix for prefix, mask_ip in enumerate(PREFIX_TO_MASK) if prefix >= 1}
+
+
+class IPConverter:
+    @staticmethod
+    async def ip_to_binary(ip_address: str) -> str:
+        return IPv4Address.from_string(ip_address).binary
 
     @staticmethod
     async def binary_to_ip(binary: str) -> str:
-        if not len(binary) == 32:
-            raise HTTPException(status_code=400, detail="Invalid binary format")
-        return ".".join(str(int(binary[i:i + 8], 2)) for i in range(0, 32, 8))
+        return str(IPv4Address.from_binary(binary))
 
     # Replace to SubnetService
     @staticmethod
     async def prefix_to_mask_ip(prefix: int) -> str:
-        if 1 < prefix > 32:
+        if not (0 <= prefix <= 32):
             raise HTTPException(status_code=400, detail="Invalid subnet mask length")
-
-        mask_binary = "1" * prefix + "0" * (32 - prefix)
-        return ".".join(str(int(mask_binary[i:i + 8], 2)) for i in range(0, 32, 8))
+        return PREFIX_TO_MASK[prefix]
 
     # Replace to SubnetService
     @staticmethod
     async def mask_ip_to_prefix(mask_ip: str) -> int:
-        try:
-            mask_octets = mask_ip.split(".")
-            if len(mask_octets) != 4:
-                raise HTTPException(status_code=400, detail="Invalid IP address format")
-
-            mask_binary = "".join(f'{int(octet):08b}' for octet in mask_octets)
-            cidr = mask_binary.count("1")
+        cidr = MASK_TO_PREFIX.get(mask_ip)
+        if cidr is not None:
+            return cidr
 
-            if not (1 <= cidr <= 32) or "01" in mask_binary:
-                raise HTTPException(status_code=400, detail="Invalid subnet mask")
+        if len(mask_ip.split(".")) != 4:
+            raise HTTPException(status_code=400, detail="Invalid IP address format")
 
-            return cidr
-        except ValueError:
+        try:
+            mask = IPv4Address.from_string(mask_ip)
+        except HTTPException:
             raise HTTPException(status_code=400, detail="Invalid subnet mask value")
 
+        cidr = mask.prefix
+        if not (1 <= cidr <= 32):
+            raise HTTPException(status_code=400, detail="Invalid subnet mask")
 
-class NetworkService:
-    def __init__(self, ip: str, subnet_mask: str):
-        self.ip = ip
-        self.subnet_mask = subnet_mask
-        self.ip_converter = IPConverter()
+        return cidr
 
-    async def get_ip_status(self):
-        if self.ip == "127.0.0.1":
-            return "Localhost"
 
-        first_octet, second_octet, *_ = map(int, self.ip.split("."))
-        if (first_octet == 10) or (first_octet == 172 and 16 <= second_octet <= 31) or (first_octet == 192 and second_octet == 168):
-            return "Private"
+class NetworkService:
+    def __init__(self, ip: Union[str, IPv4Address], subnet_mask: Union[str, IPv4Address]):
+        address = ip if isinstance(ip, IPv4Address) else IPv4Address.from_string(ip)
+        mask = subnet_mask if isinstance(subnet_mask, IPv4Address) else IPv4Address.from_string(subnet_mask)
 
-        return "Public"
+        self.ip = str(address)
+        self.subnet_mask = str(mask)
+        self.network = IPv4Network(address, mask)
 
-    async def get_ip_class(self):
-        try:
-            first_octet = int(self.ip.split(".")[0])
-        except (ValueError, IndexError):
-            raise HTTPException(status_code=400, detail="Invalid IP address")
+    @classmethod
+    def from_prefix(cls, ip: Union[str, IPv4Address], mask_prefix: int) -> "NetworkService":
+        return cls(ip=ip, subnet_mask=IPv4Address.from_prefix(mask_prefix))
 
-        ip_classes = {
-            range(1, 128): "A",
-            range(128, 192): "B",
-            range(192, 224): "C",
-            range(224, 240): "D (Multicast)",
-            range(240, 256): "E (Experimental)",
-        }
-
-        for ip_range, ip_class in ip_classes.items():
-            if first_octet in ip_range:
-                return ip_class
+    async def get_ip_status(self):
+        return self.network.address.ip_status
 
-        raise HTTPException(status_code=400, detail="Invalid IP address")
+    async def get_ip_class(self):
+        return self.network.address.ip_class
 
     async def get_network_address(self):
-        ip_binary = await self.ip_converter.ip_to_binary(self.ip)
-        mask_binary = await self.ip_converter.ip_to_binary(self.subnet_mask)
-
-        network_binary = "".join("1" if ip_bit == "1" and mask_bit == "1" else "0" for ip_bit, mask_bit in zip(ip_binary, mask_binary))
-        return await self.ip_converter.binary_to_ip(network_binary)
+        return str(self.network.network_address)
 
     async def get_broadcast_address(self):
-        ip_converter = IPConverter()
-        ip_binary = await ip_converter.ip_to_binary(self.ip)
-        mask_binary = await ip_converter.ip_to_binary(self.subnet_mask)
-
-        broadcast_binary = "".join("1" if mask_bit == "0" else ip_bit for ip_bit, mask_bit in zip(ip_binary, mask_binary))
-        return await ip_converter.binary_to_ip(broadcast_binary)
+        return str(self.network.broadcast_address)
 
     async def get_hosts(self):
-        mask_binary = await self.ip_converter.ip_to_binary(self.subnet_mask)
-        num_of_zeros = mask_binary.count("0")
-        return (2 ** num_of_zeros) - 2
+        return self.network.hosts
+
+    def get_details(self) -> dict:
+        return {
+            "ip": {
+                "address": self.ip,
+                "ip_class": self.network.address.ip_class,
+                "ip_status": self.network.address.ip_status,
+            },
+            "network": {
+                "ip": str(self.network.network_address),
+                "hosts": self.network.hosts,
+                "broadcast": str(self.network.broadcast_address),
+                "subnet_mask": self.subnet_mask,
+            },
+        }
@@ -0,0 +1,56 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+from fastapi import HTTPException
+
+from project.utils.MetricsService import metrics_registry
+
+
+class PasswordConfig:
+    BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 12))
+    WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", 2))
+    MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", 16))
+    RETRY_AFTER = os.getenv("PASSWORD_HASH_RETRY_AFTER", "1")
+
+
+password_hash_pending = metrics_registry.gauge(
+    "password_hash_pending", "bcrypt operations running or queued in the password executor")
+password_hash_rejected_total = metrics_registry.counter(
+    "password_hash_rejected_total", "bcrypt operations shed because the password executor was saturated")
+
+
+class PasswordService:
+    # bcrypt releases the GIL, so a couple of threads keep hashing off the event loop without starving it. Work beyond
+    # MAX_PENDING is rejected up front rather than queued behind seconds of hashing.
+    executor = ThreadPoolExecutor(max_workers=PasswordConfig.WORKERS, thread_name_prefix="bcrypt")
+    pending = 0
+
+    @staticmethod
+    async def run(function, *args):
+        if PasswordService.pending >= PasswordConfig.MAX_PENDING:
+            password_hash_rejected_total.inc()
+            raise HTTPException(status_code=429, detail="Too many login attempts, try again later",
+                                headers={"Retry-After": PasswordConfig.RETRY_AFTER})
+
+        PasswordService.pending += 1
+        password_hash_pending.set(value=PasswordService.pending)
+        try:
+            return await asyncio.get_running_loop().run_in_executor(PasswordService.executor, function, *args)
+        finally:
+            PasswordService.pending -= 1
+            password_hash_pending.set(value=PasswordService.pending)
+
+    @staticmethod
+    async def hash_password(password: str) -> bytes:
+        return await PasswordService.run(bcrypt.hashpw, password.encode(), bcrypt.gensalt(PasswordConfig.BCRYPT_ROUNDS))
+
+    @staticmethod
+    async def verify_password(password: str, password_hash: bytes) -> bool:
+        return await PasswordService.run(bcrypt.checkpw, password.encode(), password_hash)
+
+    @staticmethod
+    def needs_rehash(password_hash: bytes) -> bool:
+        # bcrypt hashes look like $2b$<rounds>$<salt+digest>
+        return int(password_hash.split(b"$")[2]) != PasswordConfig.BCRYPT_ROUNDS
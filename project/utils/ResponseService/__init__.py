@@ -0,0 +1,15 @@
+from typing import Any
+
+import orjson
+from fastapi.responses import Response
+
+
+def encode(content: Any) -> bytes:
+    return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+class JSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return encode(content)
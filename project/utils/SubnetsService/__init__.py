@@ -1,45 +1,181 @@
-import math
+import os
+from typing import Iterator, Optional
+
 from fastapi import HTTPException
 
-from project.utils.NetworkService import IPConverter
+from project.utils.NetworkService import IPv4Address
+
+
+class SubnetsConfig:
+    MAX_PAGE_SIZE = int(os.getenv("SUBNETS_MAX_PAGE_SIZE", 65536))
+    STREAM_CHUNK_SIZE = int(os.getenv("SUBNETS_STREAM_CHUNK_SIZE", 4096))
 
 
 class SubnetService:
 
     @staticmethod
-    async def get_subnets(network_ip_address: str, mask_prefix: int, hosts_per_subnet: int):
+    def get_layout(network_ip_address: str, mask_prefix: int, hosts_per_subnet: int):
         hosts = 2 ** (32 - mask_prefix)
         if hosts_per_subnet > hosts:
-            return HTTPException(status_code=400, detail="hosts_per_subnet exceeds available addresses in the network")
-        
-        adjusted_hosts = 2 ** math.ceil(math.log2(hosts_per_subnet + 2)) - 2
-        new_mask_prefix = 32 - math.ceil(math.log2(adjusted_hosts + 2))
+            raise HTTPException(status_code=400, detail="hosts_per_subnet exceeds available addresses in the network")
+
+        # Smallest power of two holding the requested hosts plus network and broadcast addresses
+        subnet_size = 1 << max(hosts_per_subnet + 1, 1).bit_length()
+        new_mask_prefix = 32 - (subnet_size.bit_length() - 1)
+        if new_mask_prefix < mask_prefix:
+            raise HTTPException(status_code=400, detail="hosts_per_subnet exceeds available addresses in the network")
+
+        # Host bits are cleared so an address inside the network lays out the same subnets as the network itself
+        network_ip = IPv4Address.from_string(network_ip_address).value & IPv4Address.from_prefix(mask_prefix).value
+
+        return {
+            "network_ip": network_ip,
+            "subnet_size": subnet_size,
+            "num_subnets": 1 << (new_mask_prefix - mask_prefix),
+            "subnet_mask": str(IPv4Address.from_prefix(new_mask_prefix)),
+            "mask_prefix": new_mask_prefix,
+            "usable_hosts": subnet_size - 2,
+        }
+
+    @staticmethod
+    def iter_subnets(layout: dict, offset: int = 0, limit: Optional[int] = None) -> Iterator[dict]:
+        subnet_size = layout["subnet_size"]
+        stop = layout["num_subnets"] if limit is None else min(layout["num_subnets"], offset + limit)
+        start_ip = layout["network_ip"] + offset * subnet_size
+
+        for _ in range(offset, stop):
+            yield {
+                "start_ip": IPv4Address.format(start_ip),
+                "end_ip": IPv4Address.format(start_ip + subnet_size - 1),
+            }
+            start_ip += subnet_size
+
+    @staticmethod
+    def iter_subnets_chunks(layout: dict, ndjson: bool = False) -> Iterator[bytes]:
+        subnet_size = layout["subnet_size"]
+        chunk_size = SubnetsConfig.STREAM_CHUNK_SIZE
+        fmt = IPv4Address.format
+        separator = "\n" if ndjson else ","
+
+        if not ndjson:
+            yield (
+                f'{{"subnet_mask":"{layout["subnet_mask"]}","mask_prefix":{layout["mask_prefix"]},'
+                f'"usable_hosts":{layout["usable_hosts"]},"subnets":['
+            ).encode()
+
+        start_ip = layout["network_ip"]
+        remaining = layout["num_subnets"]
+        first = True
+        while remaining:
+            count = min(chunk_size, remaining)
+            chunk = separator.join(
+                f'{{"start_ip":"{fmt(ip)}","end_ip":"{fmt(ip + subnet_size - 1)}"}}'
+                for ip in range(start_ip, start_ip + count * subnet_size, subnet_size)
+            )
+            if ndjson:
+                chunk += "\n"
+            elif not first:
+                chunk = "," + chunk
+
+            yield chunk.encode()
+            start_ip += count * subnet_size
+            remaining -= count
+            first = False
+
+        if not ndjson:
+            yield b"]}"
+
+    @staticmethod
+    async def get_subnets(network_ip_address: str, mask_prefix: int, hosts_per_subnet: int,
+                          offset: int = 0, limit: Optional[int] = None):
+        layout = SubnetService.get_layout(network_ip_address, mask_prefix, hosts_per_subnet)
+        return SubnetService.build_subnets(layout, offset, limit)
+
+    @staticmethod
+    def build_subnets(layout: dict, offset: int = 0, limit: Optional[int] = None):
+        total = layout["num_subnets"]
+
+        if limit is None and total > SubnetsConfig.MAX_PAGE_SIZE:
+            raise HTTPException(status_code=400, detail=f"Split produces {total} subnets, use offset/limit "
+                                                        f"or the streaming endpoint")
+        if offset and offset >= total:
+            raise HTTPException(status_code=404, detail="Page not found")
+
+        subnets = {
+            "subnet_mask": layout["subnet_mask"],
+            "mask_prefix": layout["mask_prefix"],
+            "usable_hosts": layout["usable_hosts"],
+            "subnets": list(SubnetService.iter_subnets(layout, offset, limit)),
+        }
+
+        if limit is not None:
+            next_offset = offset + limit
+            subnets["page"] = {
+                "offset": offset,
+                "limit": limit,
+                "total": total,
+                "next_offset": next_offset if next_offset < total else None,
+            }
+
+        return subnets
 
-        ip_converter = IPConverter()
-        network_ip_binary = await ip_converter.ip_to_binary(network_ip_address)
 
-        num_subnets = 2 ** (new_mask_prefix - mask_prefix)
-        subnet_size = 2 ** (32 - new_mask_prefix)
+class VLSMService:
 
-        subnet_mask = await ip_converter.prefix_to_mask_ip(new_mask_prefix)
+    @staticmethod
+    def get_free_blocks(start_ip: int, end_ip: int) -> list[dict]:
+        free_blocks = []
+        while start_ip < end_ip:
+            block_size = start_ip & -start_ip or 1 << 32
+            while block_size > end_ip - start_ip:
+                block_size >>= 1
+
+            free_blocks.append({
+                "start_ip": IPv4Address.format(start_ip),
+                "end_ip": IPv4Address.format(start_ip + block_size - 1),
+                "mask_prefix": 33 - block_size.bit_length(),
+            })
+            start_ip += block_size
 
-        subnets = []
-        for i in range(num_subnets):
-            subnet_start_binary = bin(int(network_ip_binary, 2) + (i * subnet_size))[2:].zfill(32)
-            subnet_start_ip = await ip_converter.binary_to_ip(subnet_start_binary)
+        return free_blocks
+
+    @staticmethod
+    async def allocate(network_ip_address: str, mask_prefix: int, requirements: list[dict]):
+        mask = IPv4Address.from_prefix(mask_prefix).value
+        network_start = IPv4Address.from_string(network_ip_address).value & mask
+        network_end = network_start + (1 << (32 - mask_prefix))
 
-            subnet_end_binary = bin(int(subnet_start_binary, 2) + subnet_size - 1)[2:].zfill(32)
-            subnet_end_ip = await ip_converter.binary_to_ip(subnet_end_binary)
+        # Largest-first over power-of-two blocks keeps the allocation cursor aligned for every
+        # following block, so the free space is always the single run [cursor, network_end)
+        blocks = sorted(
+            ((1 << max(requirement["hosts"] + 1, 1).bit_length(), index) for index, requirement in enumerate(requirements)),
+            key=lambda block: -block[0],
+        )
 
+        cursor = network_start
+        subnets, unallocated = [], []
+        for block_size, index in blocks:
+            requirement = requirements[index]
+            if cursor + block_size > network_end:
+                unallocated.append({"name": requirement["name"], "hosts": requirement["hosts"]})
+                continue
+
+            block_prefix = 33 - block_size.bit_length()
             subnets.append({
-                "start_ip": subnet_start_ip,
-                "end_ip": subnet_end_ip,
+                "name": requirement["name"],
+                "hosts": requirement["hosts"],
+                "usable_hosts": block_size - 2,
+                "mask_prefix": block_prefix,
+                "subnet_mask": IPv4Address.format((0xFFFFFFFF << (32 - block_prefix)) & 0xFFFFFFFF),
+                "start_ip": IPv4Address.format(cursor),
+                "end_ip": IPv4Address.format(cursor + block_size - 1),
             })
-        
+            cursor += block_size
+
         return {
-            "subnet_mask": subnet_mask,
-            "mask_prefix": new_mask_prefix,
-            "usable_hosts": adjusted_hosts,
-            "subnets": subnets
+            "network_ip": IPv4Address.format(network_start),
+            "mask_prefix": mask_prefix,
+            "subnets": subnets,
+            "unallocated": unallocated,
+            "free_blocks": VLSMService.get_free_blocks(cursor, network_end),
         }
-
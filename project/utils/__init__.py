@@ -1,2 +1,2 @@
-# from .TokenService import TokenService
+from .TokenService import TokenService
 from .NetworkService import NetworkService